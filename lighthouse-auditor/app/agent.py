@@ -13,126 +13,230 @@
 # limitations under the License.
 
 # mypy: disable-error-code="union-attr"
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import (
+    BaseMessage,
+    BaseMessageChunk,
+    SystemMessage,
+    ToolMessage,
+)
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langchain_google_vertexai import ChatVertexAI
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, MessagesState, StateGraph
+from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import ToolNode
 import json
 import os
-from typing import Any, Dict, List, Optional, Union
+import textwrap
+from operator import attrgetter
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+    cast,
+)
 
-from app.utils.github_integration import CodeFix, GitHubIntegration
-from app.utils.lighthouse import LighthouseConfig, LighthouseRunner, ReportChunker
+import orjson
+
+from app.utils.cache import ToolResultCache, make_cache_key
+from app.utils.github_async import AsyncGitHubIntegration
+from app.utils.github_integration import CodeFix
+from app.utils.json_stream import iter_array
+from app.utils.lighthouse import (
+    AuditIssue,
+    LighthouseConfig,
+    LighthouseRunner,
+)
 
 LOCATION = "us-central1"
 LLM = "gemini-2.0-flash-001"
+# Prompt budget for the system message plus conversation history. Kept well
+# below the model's context window so long audit sessions stay responsive.
+CONTEXT_TOKEN_BUDGET = 128_000
 
 # Initialize Lighthouse runner
 lighthouse_runner = LighthouseRunner(LighthouseConfig())
 
+# Cache report analyses so repeated requests skip parsing
+tool_cache = ToolResultCache(
+    os.getenv("TOOL_CACHE_PATH", "/tmp/lh_agent_cache/tool_results.db"), ttl=3600
+)
+
 # Initialize GitHub integration if token is available
 github_integration = None
 if github_token := os.getenv("GITHUB_TOKEN"):
-    github_integration = GitHubIntegration(github_token)
+    github_integration = AsyncGitHubIntegration(github_token)
 
 
 # 1. Define tools
 @tool
-def run_lighthouse_audit(url: str, output_path: Optional[str] = None) -> str:
+def run_lighthouse_audit(
+    url: str, output_path: Optional[str] = None, force_refresh: bool = False
+) -> str:
     """Run a Lighthouse audit on the specified URL.
     
     Args:
         url: The URL to audit
         output_path: Optional path to save the report
+        force_refresh: Re-run the audit even if a recent result is cached
         
     Returns:
         JSON string containing audit results
     """
     try:
-        results = lighthouse_runner.run_audit(url, output_path)
-        # Chunk the report before returning
-        chunks = ReportChunker.chunk_report(results)
-        return json.dumps(chunks)
+        # Recent reports are reused by the runner's report cache, so results
+        # are not cached again here
+        chunks = list(
+            lighthouse_runner.run_audit_chunks(url, output_path, use_cache=not force_refresh)
+        )
+        return orjson.dumps(chunks).decode()
     except Exception as e:
         return f"Error running Lighthouse audit: {str(e)}"
 
 
+ReportInput = Union[str, List[Dict[str, Any]], Dict[str, Any]]
+
+# Chunk arrays longer than this are decoded incrementally rather than in one go
+LARGE_REPORT_CHARS = 5_000_000
+
+
+def _check_not_truncated(report_json: str) -> None:
+    """Reject JSON text that cannot be a complete document before parsing it.
+
+    Truncated tool arguments otherwise cost a full multi-megabyte parse that
+    ends in a decode error.
+
+    Raises:
+        ValueError: If the text does not end with "}" or "]"
+    """
+    if report_json.rstrip()[-1:] not in ("}", "]"):
+        raise ValueError(
+            "report_input JSON appears truncated (does not end with } or ]). "
+            "Please pass the complete report."
+        )
+
+
+def _parse_report_input(report_input: ReportInput) -> List[Dict[str, Any]]:
+    """Normalize a report, a list of report chunks, or their JSON into chunks.
+
+    Raises:
+        orjson.JSONDecodeError: If a string input is not valid JSON
+        ValueError: If the input is truncated, or is not a report or a list of
+            report chunks
+    """
+    if isinstance(report_input, str):
+        _check_not_truncated(report_input)
+        parsed_json = orjson.loads(report_input)
+        if isinstance(parsed_json, list):
+            return parsed_json  # It's a list of chunks
+        if isinstance(parsed_json, dict):
+            return [parsed_json]  # It's a single report, treat as one chunk
+        raise ValueError("Parsed JSON is not a list of chunks or a single report dictionary.")
+    if isinstance(report_input, list):
+        if not all(isinstance(item, dict) for item in report_input):
+            raise ValueError("report_input list contains non-dictionary items.")
+        return report_input  # Already a list of chunk dicts
+    if isinstance(report_input, dict):
+        return [report_input]  # Single pre-parsed report
+    raise ValueError(
+        f"Invalid report_input type. Expected str, list of dicts, or dict. Got {type(report_input)}"
+    )
+
+
+def _is_large_chunk_array(report_json: str) -> bool:
+    """Whether a JSON string is a chunk array big enough to decode lazily."""
+    return len(report_json) > LARGE_REPORT_CHARS and report_json.lstrip()[:1] == "["
+
+
+def _format_issue(issue: AuditIssue) -> str:
+    """Render a single audit issue as a markdown block."""
+    return (
+        f"## {issue.title} (Impact: {issue.impact})\n"
+        f"Score: {issue.score}\n"
+        f"\n{issue.description}\n\n"
+        "### Suggestions:"
+        + "".join(f"\n- {suggestion}" for suggestion in issue.suggestions)
+        + (
+            f"\n\n### Problematic Code:\n```\n{issue.code_snippet}\n```\n"
+            if issue.code_snippet
+            else ""
+        )
+    )
+
+
+def _format_analysis(report_chunks_data: Iterable[Dict[str, Any]]) -> str:
+    """Extract issues from report chunks and format them as markdown.
+
+    Issues are formatted as soon as their chunk is processed, so only one
+    chunk's worth of AuditIssue objects is alive at a time. Chunks may be
+    produced lazily.
+    """
+    response = ["# Lighthouse Audit Analysis\n"]
+
+    total_issues = 0
+    chunk_count = 0
+    for i, chunk_data in enumerate(report_chunks_data):
+        chunk_count += 1
+        if not isinstance(chunk_data, dict):
+            # Log or return an error for this specific chunk
+            print(f"Warning: Chunk {i} is not a dictionary, skipping.")
+            continue
+        for issue in lighthouse_runner.extract_issues(chunk_data):
+            response.append(_format_issue(issue))
+            total_issues += 1
+
+    if total_issues == 0:
+        return "No significant issues found in the Lighthouse report."
+
+    if chunk_count > 1:
+        response.insert(1, f"Analyzed from {chunk_count} report chunks.\n")
+
+    return "\n".join(response)
+
+
 @tool
-def analyze_lighthouse_report(report_input: Union[str, List[Dict[str, Any]], Dict[str, Any]]) -> str:
+def analyze_lighthouse_report(
+    report_input: ReportInput,
+    force_refresh: bool = False,
+) -> str:
     """Analyze a Lighthouse report (or chunks of it) and extract key issues.
     
     Args:
         report_input: JSON string containing Lighthouse report (can be a list of chunks or a single report),
         or a pre-parsed list of chunks, or a single pre-parsed report.
+        force_refresh: Re-analyze the report even if a cached analysis exists
         
     Returns:
         Analysis of issues found
     """
+    report_chunks_data: Iterable[Dict[str, Any]]
     try:
-        report_chunks_data: List[Dict[str, Any]] = []
-        if isinstance(report_input, str):
-            parsed_json = json.loads(report_input)
-            if isinstance(parsed_json, list):
-                report_chunks_data = parsed_json  # It's a list of chunks
-            elif isinstance(parsed_json, dict):
-                report_chunks_data = [parsed_json] # It's a single report, treat as one chunk
-            else:
-                return "Error: Parsed JSON is not a list of chunks or a single report dictionary."
-        elif isinstance(report_input, list):
-            all_dicts = True
-            for item in report_input:
-                if not isinstance(item, dict):
-                    all_dicts = False
-                    break
-            if all_dicts:
-                report_chunks_data = report_input # Already a list of chunk dicts
-            else:
-                return "Error: report_input list contains non-dictionary items."
-        elif isinstance(report_input, dict):
-            report_chunks_data = [report_input] # Single pre-parsed report
+        if isinstance(report_input, str) and _is_large_chunk_array(report_input):
+            _check_not_truncated(report_input)
+            # Decode one chunk at a time instead of materializing the whole array
+            cache_key = make_cache_key("analyze", report_input)
+            report_chunks_data = iter_array(report_input)
         else:
-            return f"Error: Invalid report_input type. Expected str, list of dicts, or dict. Got {type(report_input)}"
-
-        all_issues: List[Any] = [] # Assuming AuditIssue type from lighthouse_runner
-        for i, chunk_data in enumerate(report_chunks_data):
-            if not isinstance(chunk_data, dict):
-                # Log or return an error for this specific chunk
-                print(f"Warning: Chunk {i} is not a dictionary, skipping.")
-                continue
-            issues_from_chunk = lighthouse_runner.extract_issues(chunk_data)
-            all_issues.extend(issues_from_chunk)
-
-        # Format response
-        response = ["# Lighthouse Audit Analysis\n"]
-        
-        if len(report_chunks_data) > 1:
-            response.append(f"Analyzed from {len(report_chunks_data)} report chunks.\n")
-
-        if not all_issues:
-            return "No significant issues found in the Lighthouse report."
-
-        for issue in all_issues:
-            response.extend([
-                f"## {issue.title} (Impact: {issue.impact})",
-                f"Score: {issue.score}",
-                f"\n{issue.description}\n",
-                "### Suggestions:"
-            ])
-            
-            for suggestion in issue.suggestions:
-                response.append(f"- {suggestion}")
-                
-            if issue.code_snippet:
-                response.extend([
-                    "\n### Problematic Code:",
-                    "```",
-                    issue.code_snippet,
-                    "```\n"
-                ])
-                
-        return "\n".join(response)
+            report_chunks_data = _parse_report_input(report_input)
+            cache_key = make_cache_key("analyze", report_chunks_data)
+    except orjson.JSONDecodeError as e:
+        return f"Error decoding report JSON: {str(e)}"
+    except ValueError as e:
+        return f"Error: {str(e)}"
+
+    try:
+        if not force_refresh and (cached := tool_cache.get(cache_key)) is not None:
+            return cached
+
+        result = _format_analysis(report_chunks_data)
+        tool_cache.set(cache_key, result)
+        return result
     except json.JSONDecodeError as e:
         return f"Error decoding report JSON: {str(e)}"
     except Exception as e:
@@ -140,12 +244,55 @@ def analyze_lighthouse_report(report_input: Union[str, List[Dict[str, Any]], Dic
 
 
 @tool
-def create_github_pr(repo: str, fixes: List[Dict[str, Any]], base_branch: str = "main") -> str:
+def propose_fixes(report_input: ReportInput) -> str:
+    """Turn the issues in a Lighthouse report into fix drafts that need completion.
+    
+    Every issue with a problematic code snippet becomes one draft. The snippet
+    comes from the rendered page, not from a source file, so a draft cannot be
+    passed to create_github_pr as is. For each draft, find the repository file
+    that produces the snippet and write that file's complete fixed content.
+    Then pass {file_path, fixed_content, description, issue_title} to
+    create_github_pr.
+    
+    Args:
+        report_input: JSON string containing Lighthouse report (can be a list of chunks or a single report),
+        or a pre-parsed list of chunks, or a single pre-parsed report.
+        
+    Returns:
+        JSON object whose "needs_completion" list holds one draft per issue
+    """
+    try:
+        report_chunks_data = _parse_report_input(report_input)
+    except orjson.JSONDecodeError as e:
+        return f"Error decoding report JSON: {str(e)}"
+    except ValueError as e:
+        return f"Error: {str(e)}"
+
+    try:
+        drafts = [
+            {
+                "issue_title": issue.title,
+                "description": issue.description,
+                "code_snippet": issue.code_snippet,
+            }
+            for chunk_data in report_chunks_data
+            for issue in lighthouse_runner.extract_issues(chunk_data)
+            if issue.code_snippet
+        ]
+        return orjson.dumps({"needs_completion": drafts}).decode()
+    except Exception as e:
+        return f"Error proposing fixes: {str(e)}"
+
+
+@tool
+async def create_github_pr(repo: str, fixes: List[Dict[str, Any]], base_branch: str = "main") -> str:
     """Create a GitHub pull request with fixes.
     
     Args:
         repo: Repository name (owner/repo)
-        fixes: List of fixes to apply
+        fixes: List of fixes to apply. Each needs a file_path in the repository
+            and fixed_content holding that file's complete new content, and
+            may have an issue_title and description for the pull request.
         base_branch: Base branch name
         
     Returns:
@@ -153,27 +300,45 @@ def create_github_pr(repo: str, fixes: List[Dict[str, Any]], base_branch: str =
     """
     if not github_integration:
         return "GitHub integration not configured. Set GITHUB_TOKEN environment variable."
+
+    # fixed_content replaces the whole file, so incomplete fixes are rejected
+    # rather than blanking files or committing to unknown paths
+    incomplete = [
+        str(fix.get("issue_title") or f"fix {i}")
+        for i, fix in enumerate(fixes)
+        if not all(
+            isinstance(fix.get(key), str) and fix[key]
+            for key in ("file_path", "fixed_content")
+        )
+    ]
+    if incomplete:
+        return (
+            "Error: every fix needs a non-empty file_path and fixed_content "
+            f"(the complete new file). Incomplete: {', '.join(incomplete)}"
+        )
         
     try:
-        # Convert fixes to CodeFix objects
-        code_fixes = []
-        for fix in fixes:
-            code_fixes.append(CodeFix(
+        # Convert fixes to CodeFix objects; only the path and new content are
+        # required, the rest only describes the change
+        code_fixes = [
+            CodeFix(
                 file_path=fix["file_path"],
-                original_content=fix["original_content"],
+                original_content=str(fix.get("original_content") or ""),
                 fixed_content=fix["fixed_content"],
-                description=fix["description"],
-                issue_title=fix["issue_title"]
-            ))
+                description=str(fix.get("description") or ""),
+                issue_title=str(fix.get("issue_title") or f"Update {fix['file_path']}"),
+            )
+            for fix in fixes
+        ]
             
         # Create pull request
-        pr = github_integration.apply_fixes(repo, code_fixes, base_branch)
-        return f"Created pull request: {pr.html_url}"
+        pr = await github_integration.apply_fixes(repo, code_fixes, base_branch)
+        return f"Created pull request: {pr['html_url']}"
     except Exception as e:
         return f"Error creating pull request: {str(e)}"
 
 
-tools = [run_lighthouse_audit, analyze_lighthouse_report, create_github_pr]
+tools = [run_lighthouse_audit, analyze_lighthouse_report, propose_fixes, create_github_pr]
 
 # 2. Set up the language model
 llm = ChatVertexAI(
@@ -186,15 +351,10 @@ llm = ChatVertexAI(
 
 
 # 3. Define workflow components
-def should_continue(state: MessagesState) -> str:
-    """Determines whether to use tools or end the conversation."""
-    last_message = state["messages"][-1]
-    return "tools" if getattr(last_message, "tool_calls", None) else END
-
-
-def call_model(state: MessagesState, config: RunnableConfig) -> dict[str, BaseMessage]:
-    """Calls the language model and returns the response."""
-    system_message = """You are a Lighthouse performance auditor that helps improve web applications.
+# The system prompt is built once so every call sends a byte-identical prefix,
+# which keeps it eligible for the model's prompt cache.
+SYSTEM_MESSAGE = textwrap.dedent("""\
+    You are a Lighthouse performance auditor that helps improve web applications.
     You can:
     1. Run Lighthouse audits on URLs using the installed Chromium browser
     2. Analyze Lighthouse reports to identify issues
@@ -210,7 +370,10 @@ def call_model(state: MessagesState, config: RunnableConfig) -> dict[str, BaseMe
     1. Parse and analyze the report
     2. Identify key performance, accessibility, and SEO issues
     3. Suggest specific improvements for each issue
-    4. If GitHub integration is configured, create PRs with fixes
+    4. If GitHub integration is configured, call propose_fixes on the report. For each
+       draft it returns, find the repository file behind the code snippet and write
+       that file's complete fixed content, then pass the completed fixes to
+       create_github_pr
     
     When encountering errors:
     1. For Chrome/Chromium errors:
@@ -230,10 +393,75 @@ def call_model(state: MessagesState, config: RunnableConfig) -> dict[str, BaseMe
        - Check repository permissions
        - Ensure branch exists and is accessible
     
-    Always explain your findings, recommendations, and any error handling steps clearly."""
-    
-    messages_with_system = [{"type": "system", "content": system_message}] + state["messages"]
-    response = llm.invoke(messages_with_system, config)
+    Always explain your findings, recommendations, and any error handling steps clearly.
+""").strip()
+_SYSTEM_MSG = SystemMessage(content=SYSTEM_MESSAGE)
+_SYSTEM_TOKENS = len(SYSTEM_MESSAGE) // 4
+
+
+def _estimate_tokens(message: BaseMessage) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return len(str(message.content)) // 4
+
+
+def _truncate_to_budget(
+    messages: Sequence[BaseMessage], budget: int
+) -> List[BaseMessage]:
+    """Trim history to fit the token budget.
+
+    Keeps the first message (the original request) and as many of the most
+    recent messages as fit. The kept tail never starts with a tool result,
+    since the model rejects a tool response without its preceding call.
+    """
+    if sum(_estimate_tokens(m) for m in messages) <= budget or len(messages) <= 2:
+        return list(messages)
+
+    first, rest = messages[0], messages[1:]
+    remaining = budget - _estimate_tokens(first)
+    start = len(rest) - 1  # Always keep the latest message
+    remaining -= _estimate_tokens(rest[start])
+    while start > 0 and (cost := _estimate_tokens(rest[start - 1])) <= remaining:
+        remaining -= cost
+        start -= 1
+    # Extend back to the AI message whose tool calls produced these results
+    while start > 0 and isinstance(rest[start], ToolMessage):
+        start -= 1
+    return [first, *rest[start:]]
+
+
+_get_tool_calls = attrgetter("tool_calls")
+
+
+def should_continue(state: MessagesState) -> str:
+    """Determines whether to use tools or end the conversation."""
+    try:
+        return "tools" if _get_tool_calls(state["messages"][-1]) else END
+    except AttributeError:
+        # Only AI messages carry tool calls
+        return END
+
+
+async def call_model(state: MessagesState, config: RunnableConfig) -> dict[str, BaseMessage]:
+    """Calls the language model and returns the response.
+
+    Chunks are streamed from the model so that ``stream_mode="messages"``
+    consumers receive tokens as they are generated. If the stream yields
+    nothing, the model is called once more without streaming.
+    """
+    history = _truncate_to_budget(
+        state["messages"], budget=CONTEXT_TOKEN_BUDGET - _SYSTEM_TOKENS
+    )
+    messages_with_system = [_SYSTEM_MSG, *history]
+    streamed: Optional[BaseMessageChunk] = None
+    async for chunk in llm.astream(messages_with_system, config):
+        # Chat models stream message chunks, which add up to the full message
+        chunk = cast(BaseMessageChunk, chunk)
+        streamed = chunk if streamed is None else streamed + chunk
+    response: BaseMessage = (
+        streamed
+        if streamed is not None
+        else await llm.ainvoke(messages_with_system, config)
+    )
     return {"messages": response}
 
 
@@ -248,4 +476,15 @@ workflow.add_conditional_edges("agent", should_continue)
 workflow.add_edge("tools", "agent")
 
 # 6. Compile the workflow
-agent = workflow.compile()
+def build_agent(checkpointer: Optional[BaseCheckpointSaver] = None) -> CompiledStateGraph:
+    """Compile the workflow, optionally with a checkpointer.
+
+    The module-level ``agent`` is compiled without one because the server
+    resends the full conversation on every request. Callers that keep a
+    ``thread_id`` across turns (e.g. notebooks) can pass a saver such as
+    ``MemorySaver()`` so a resumed thread does not replay prior steps.
+    """
+    return workflow.compile(checkpointer=checkpointer)
+
+
+agent = build_agent()
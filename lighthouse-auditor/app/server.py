@@ -14,7 +14,7 @@
 
 import logging
 import os
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse, StreamingResponse
@@ -63,10 +63,10 @@ def set_tracing_properties(config: RunnableConfig) -> None:
     )
 
 
-def stream_messages(
+async def stream_messages(
     input: InputChat,
     config: RunnableConfig | None = None,
-) -> Generator[str, None, None]:
+) -> AsyncGenerator[str, None]:
     """Stream events in response to an input chat.
 
     Args:
@@ -80,7 +80,7 @@ def stream_messages(
     set_tracing_properties(config)
     input_dict = input.model_dump()
 
-    for data in agent.stream(input_dict, config=config, stream_mode="messages"):
+    async for data in agent.astream(input_dict, config=config, stream_mode="messages"):
         yield dumps(data) + "\n"
 
 
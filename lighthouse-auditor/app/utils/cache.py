@@ -0,0 +1,74 @@
+"""Persistent result cache for the Lighthouse auditor tools."""
+
+import hashlib
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+
+def make_cache_key(namespace: str, payload: Any) -> str:
+    """Build a stable cache key from a namespace and JSON-serializable arguments.
+
+    Args:
+        namespace: Prefix identifying the cached operation
+        payload: Arguments the cached result depends on
+
+    Returns:
+        Cache key of the form "namespace:sha256"
+    """
+    canonical = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return f"{namespace}:{hashlib.sha256(canonical).hexdigest()}"
+
+
+class ToolResultCache:
+    """SQLite-backed key/value store with per-entry expiry.
+
+    A connection is opened per operation so the cache can be shared by the
+    worker threads tools run on. Expired entries are deleted on open and
+    whenever a value is stored, so the database does not grow without bound.
+    """
+
+    def __init__(self, path: str | Path, ttl: float = 3600):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)"
+            )
+            self._purge_expired(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    @staticmethod
+    def _purge_expired(conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value for key, or None if missing or expired."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """Store value under key for ttl seconds (defaults to the cache TTL)."""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with closing(self._connect()) as conn, conn:
+            self._purge_expired(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
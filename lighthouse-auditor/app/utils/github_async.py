@@ -0,0 +1,226 @@
+"""Async GitHub integration utilities for the Lighthouse auditor."""
+
+import asyncio
+from typing import Any
+
+import httpx
+
+from app.utils.github_integration import (
+    FIXES_BRANCH,
+    PR_TITLE,
+    CodeFix,
+    fixed_file_mode,
+    generate_commit_message,
+    generate_pr_description,
+    select_applicable_fixes,
+)
+
+GITHUB_API_URL = "https://api.github.com"
+
+
+class AsyncGitHubIntegration:
+    """Handles GitHub repository operations without blocking the event loop.
+
+    An HTTP client is opened per apply_fixes call and closed when it returns,
+    so no connection outlives the request that needed it.
+    """
+
+    def __init__(self, token: str):
+        """Initialize async GitHub integration.
+
+        Args:
+            token: GitHub personal access token
+        """
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+
+    def _client(self) -> httpx.AsyncClient:
+        """Create a client for the GitHub REST API."""
+        return httpx.AsyncClient(
+            base_url=GITHUB_API_URL, headers=self.headers, timeout=30.0
+        )
+
+    @staticmethod
+    async def _request(
+        client: httpx.AsyncClient, method: str, url: str, **kwargs: Any
+    ) -> Any:
+        """Send a request to the GitHub REST API and return the decoded body.
+
+        Args:
+            client: Client to send the request with
+            method: HTTP method
+            url: Path relative to the API base URL
+            **kwargs: Extra arguments forwarded to httpx
+
+        Returns:
+            Parsed JSON response
+        """
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def create_branch(
+        self, client: httpx.AsyncClient, repo_name: str, new_branch: str, sha: str
+    ) -> None:
+        """Create a new branch in the repository.
+
+        Args:
+            client: Client to send the request with
+            repo_name: Repository name in format "owner/repo"
+            new_branch: Name of the new branch to create
+            sha: SHA of the commit the branch points at
+        """
+        await self._request(
+            client,
+            "POST",
+            f"/repos/{repo_name}/git/refs",
+            json={"ref": f"refs/heads/{new_branch}", "sha": sha},
+        )
+
+    async def create_pull_request(
+        self,
+        client: httpx.AsyncClient,
+        repo_name: str,
+        title: str,
+        body: str,
+        head: str,
+        base: str = "main",
+        draft: bool = False,
+    ) -> dict[str, Any]:
+        """Create a pull request.
+
+        Args:
+            client: Client to send the request with
+            repo_name: Repository name in format "owner/repo"
+            title: PR title
+            body: PR description
+            head: Head branch
+            base: Base branch
+            draft: Whether to create as draft PR
+
+        Returns:
+            Created pull request as returned by the API
+        """
+        return await self._request(
+            client,
+            "POST",
+            f"/repos/{repo_name}/pulls",
+            json={
+                "title": title,
+                "body": body,
+                "head": head,
+                "base": base,
+                "draft": draft,
+            },
+        )
+
+    async def apply_fixes(
+        self, repo_name: str, fixes: list[CodeFix], base_branch: str = "main"
+    ) -> dict[str, Any]:
+        """Apply fixes and create a pull request.
+
+        Args:
+            repo_name: Repository name (owner/repo)
+            fixes: List of CodeFix objects
+            base_branch: Base branch name
+
+        Returns:
+            Created pull request as returned by the API
+
+        Raises:
+            ValueError: If none of the fixes could be applied
+        """
+        async with self._client() as client:
+            branch = await self._request(
+                client, "GET", f"/repos/{repo_name}/branches/{base_branch}"
+            )
+            base_sha = branch["commit"]["sha"]
+            base_tree_sha = branch["commit"]["commit"]["tree"]["sha"]
+
+            # Only fixes to files that exist on the base branch are applied
+            base_tree = await self._request(
+                client,
+                "GET",
+                f"/repos/{repo_name}/git/trees/{base_tree_sha}",
+                params={"recursive": "1"},
+            )
+            existing_modes = (
+                None
+                if base_tree.get("truncated")
+                else {
+                    element["path"]: element["mode"]
+                    for element in base_tree["tree"]
+                    if element["type"] == "blob"
+                }
+            )
+            fixes = select_applicable_fixes(fixes, existing_modes)
+
+            # Upload the fixed files as blobs concurrently
+            blobs = await asyncio.gather(
+                *(
+                    self._request(
+                        client,
+                        "POST",
+                        f"/repos/{repo_name}/git/blobs",
+                        json={"content": fix.fixed_content, "encoding": "utf-8"},
+                    )
+                    for fix in fixes
+                ),
+                return_exceptions=True,
+            )
+
+            # Commit all fixes as one tree; a later fix to the same path wins
+            tree_elements: dict[str, dict[str, str]] = {}
+            applied: list[CodeFix] = []
+            for fix, blob in zip(fixes, blobs, strict=True):
+                if isinstance(blob, BaseException):
+                    print(f"Failed to apply fix to {fix.file_path}: {blob!s}")
+                    continue
+                tree_elements[fix.file_path] = {
+                    "path": fix.file_path,
+                    "mode": fixed_file_mode(existing_modes, fix.file_path),
+                    "type": "blob",
+                    "sha": blob["sha"],
+                }
+                applied.append(fix)
+
+            if not applied:
+                raise ValueError("None of the fixes could be applied")
+
+            tree = await self._request(
+                client,
+                "POST",
+                f"/repos/{repo_name}/git/trees",
+                json={
+                    "base_tree": base_tree_sha,
+                    "tree": list(tree_elements.values()),
+                },
+            )
+            commit = await self._request(
+                client,
+                "POST",
+                f"/repos/{repo_name}/git/commits",
+                json={
+                    "message": generate_commit_message(applied),
+                    "tree": tree["sha"],
+                    "parents": [base_sha],
+                },
+            )
+
+            # Create the branch for the fixes at the new commit
+            branch_name = FIXES_BRANCH
+            await self.create_branch(client, repo_name, branch_name, commit["sha"])
+
+            # Create pull request
+            return await self.create_pull_request(
+                client,
+                repo_name=repo_name,
+                title=PR_TITLE,
+                body=generate_pr_description(applied),
+                head=branch_name,
+                base=base_branch,
+                draft=True,  # Create as draft PR for review
+            )
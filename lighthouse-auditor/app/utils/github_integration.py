@@ -1,11 +1,35 @@
 """GitHub integration utilities for the Lighthouse auditor."""
 
-import base64
+import time
+from collections import defaultdict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import DefaultDict, List, Optional
 
-from github import Github, InputFileContent, Repository
+from github import Auth, Github, InputGitTreeElement
+from github.GitBlob import GitBlob
+from github.GithubRetry import GithubRetry
 from github.PullRequest import PullRequest
+from github.Repository import Repository
+
+FIXES_BRANCH = "lighthouse-fixes"
+PR_TITLE = "🚨 Lighthouse Performance Improvements"
+
+# Blobs for the fixed files are uploaded concurrently
+MAX_FIX_WORKERS = 8
+
+# Connection pool shared by those workers; larger than the worker count so
+# concurrent apply_fixes calls do not open throwaway connections
+GITHUB_POOL_SIZE = 20
+
+# Repository lookups are reused for this many seconds before being refetched
+REPO_CACHE_TTL = 300
+
+# Git modes of regular files and symbolic links
+FILE_MODE = "100644"
+SYMLINK_MODE = "120000"
 
 
 @dataclass
@@ -18,6 +42,134 @@ class CodeFix:
     issue_title: str
 
 
+def select_applicable_fixes(
+    fixes: List[CodeFix], existing_modes: Optional[Mapping[str, str]]
+) -> List[CodeFix]:
+    """Drop fixes that cannot be committed as a change to an existing file.
+    
+    Args:
+        fixes: Proposed fixes
+        existing_modes: Git modes of the files on the base branch by path, or
+            None if they could not all be listed
+        
+    Returns:
+        Fixes with a file path, new content and, when known, an existing
+        target that is not a symbolic link
+    """
+    applicable = []
+    for fix in fixes:
+        if not fix.file_path:
+            print(f"Skipping fix '{fix.issue_title}': no file path")
+        elif not fix.fixed_content:
+            print(f"Skipping fix to {fix.file_path}: no fixed content")
+        elif existing_modes is not None and fix.file_path not in existing_modes:
+            print(f"Skipping fix to {fix.file_path}: file not found on base branch")
+        elif existing_modes is not None and existing_modes[fix.file_path] == SYMLINK_MODE:
+            # The blob of a link holds its target, not file content
+            print(f"Skipping fix to {fix.file_path}: path is a symbolic link")
+        else:
+            applicable.append(fix)
+    return applicable
+
+
+def fixed_file_mode(existing_modes: Mapping[str, str] | None, file_path: str) -> str:
+    """Git mode to commit a fixed file with, keeping e.g. the executable bit.
+
+    Args:
+        existing_modes: Git modes of the files on the base branch by path, or
+            None if they could not all be listed
+        file_path: Path of the fixed file
+
+    Returns:
+        The file's mode on the base branch, or a regular file's if unknown
+    """
+    return (existing_modes or {}).get(file_path, FILE_MODE)
+
+
+def generate_commit_message(fixes: List[CodeFix]) -> str:
+    """Generate the message for the single commit that carries all fixes.
+    
+    Args:
+        fixes: List of applied fixes
+        
+    Returns:
+        Commit message
+    """
+    if len(fixes) == 1:
+        return f"Fix: {fixes[0].issue_title}\n\n{fixes[0].description}"
+    return f"Fix {len(fixes)} Lighthouse issues\n\n" + "\n".join(
+        f"- {fix.issue_title}: {fix.description}" for fix in fixes
+    )
+
+
+def generate_pr_description(fixes: List[CodeFix]) -> str:
+    """Generate a detailed pull request description.
+    
+    Args:
+        fixes: List of applied fixes
+        
+    Returns:
+        Formatted PR description
+    """
+    description = [
+        f"# {PR_TITLE}",
+        "\nThis PR contains automated fixes for issues identified by Lighthouse audits.\n",
+        "## 🔧 Changes Made\n"
+    ]
+    
+    # Group fixes by file
+    fixes_by_file: DefaultDict[str, List[CodeFix]] = defaultdict(list)
+    for fix in fixes:
+        fixes_by_file[fix.file_path].append(fix)
+        
+    # Add details for each file
+    description.extend(
+        f"\n### 📄 `{file_path}`\n\n"
+        + "\n".join(
+            f"- **{fix.issue_title}**\n  - {fix.description}\n" for fix in file_fixes
+        )
+        for file_path, file_fixes in fixes_by_file.items()
+    )
+            
+    description.extend([
+        "\n## 🔍 Review Notes",
+        "- This PR was automatically generated by the Lighthouse Auditor",
+        "- Please review the changes carefully before merging",
+        "- Test the changes to ensure no regressions",
+        "\n## 📊 Expected Improvements",
+        "- Improved performance metrics",
+        "- Better accessibility compliance",
+        "- Enhanced SEO optimization"
+    ])
+    
+    return "\n".join(description)
+
+
+@lru_cache(maxsize=4)
+def _github_client(token: str) -> Github:
+    """Return the shared client for a token.
+    
+    Reusing one client keeps its HTTP connection pool (and the TLS sessions
+    to api.github.com) warm across GitHubIntegration instances.
+    """
+    return Github(
+        auth=Auth.Token(token),
+        per_page=100,
+        retry=GithubRetry(total=5, backoff_factor=0.3),
+        pool_size=GITHUB_POOL_SIZE,
+    )
+
+
+@lru_cache(maxsize=64)
+def _get_repo(token: str, repo_name: str, ttl_bucket: int) -> Repository:
+    """Fetch a repository, memoized per token and name.
+    
+    ``ttl_bucket`` changes every REPO_CACHE_TTL seconds, which expires the
+    cached entry.
+    """
+    return _github_client(token).get_repo(repo_name)
+
+
 class GitHubIntegration:
     """Handles GitHub repository operations and pull request creation."""
     
@@ -27,7 +179,8 @@ class GitHubIntegration:
         Args:
             token: GitHub personal access token
         """
-        self.github = Github(token)
+        self._token = token
+        self.github = _github_client(token)
         
     def get_repository(self, repo_name: str) -> Repository:
         """Get a GitHub repository by name.
@@ -38,73 +191,17 @@ class GitHubIntegration:
         Returns:
             GitHub Repository object
         """
-        return self.github.get_repo(repo_name)
+        return _get_repo(self._token, repo_name, int(time.monotonic() // REPO_CACHE_TTL))
         
-    def create_branch(self, repo: Repository, base_branch: str, new_branch: str) -> str:
+    def create_branch(self, repo: Repository, new_branch: str, sha: str) -> None:
         """Create a new branch in the repository.
         
         Args:
             repo: GitHub Repository object
-            base_branch: Name of the base branch
             new_branch: Name of the new branch to create
-            
-        Returns:
-            SHA of the new branch's HEAD
-        """
-        # Get the SHA of the base branch's HEAD
-        base_sha = repo.get_branch(base_branch).commit.sha
-        
-        # Create the new branch
-        ref = f"refs/heads/{new_branch}"
-        repo.create_git_ref(ref=ref, sha=base_sha)
-        
-        return base_sha
-        
-    def get_file_content(self, repo: Repository, path: str, ref: Optional[str] = None) -> Tuple[str, str]:
-        """Get the content and SHA of a file from the repository.
-        
-        Args:
-            repo: GitHub Repository object
-            path: Path to the file
-            ref: Optional reference (branch, tag, or commit SHA)
-            
-        Returns:
-            Tuple of (decoded content, file SHA)
-        """
-        content_file = repo.get_contents(path, ref=ref)
-        content = base64.b64decode(content_file.content).decode('utf-8')
-        return content, content_file.sha
-        
-    def update_file(
-        self,
-        repo: Repository,
-        path: str,
-        content: str,
-        message: str,
-        branch: str,
-        sha: Optional[str] = None
-    ) -> None:
-        """Update a file in the repository.
-        
-        Args:
-            repo: GitHub Repository object
-            path: Path to the file
-            content: New content
-            message: Commit message
-            branch: Branch to commit to
-            sha: Optional SHA of the file to update
+            sha: SHA of the commit the branch points at
         """
-        if sha is None:
-            # Get the current file's SHA
-            _, sha = self.get_file_content(repo, path, branch)
-            
-        repo.update_file(
-            path=path,
-            message=message,
-            content=content,
-            sha=sha,
-            branch=branch
-        )
+        repo.create_git_ref(ref=f"refs/heads/{new_branch}", sha=sha)
         
     def create_pull_request(
         self,
@@ -151,35 +248,60 @@ class GitHubIntegration:
             
         Returns:
             Created PullRequest object
+            
+        Raises:
+            ValueError: If none of the fixes could be applied
         """
         repo = self.get_repository(repo_name)
+        base_commit = repo.get_branch(base_branch).commit.commit
         
-        # Create a new branch for the fixes
-        branch_name = "lighthouse-fixes"
-        self.create_branch(repo, base_branch, branch_name)
+        # Only fixes to files that exist on the base branch are applied
+        base_tree = repo.get_git_tree(base_commit.tree.sha, recursive=True)
+        existing_modes = (
+            None
+            if base_tree.raw_data.get("truncated")
+            else {
+                element.path: element.mode
+                for element in base_tree.tree
+                if element.type == "blob"
+            }
+        )
+        fixes = select_applicable_fixes(fixes, existing_modes)
         
-        # Apply each fix
-        for fix in fixes:
-            try:
-                # Get current content and SHA
-                current_content, sha = self.get_file_content(repo, fix.file_path, branch_name)
-                
-                # Update the file
-                commit_message = f"Fix: {fix.issue_title}\n\n{fix.description}"
-                self.update_file(
-                    repo=repo,
-                    path=fix.file_path,
-                    content=fix.fixed_content,
-                    message=commit_message,
-                    branch=branch_name,
-                    sha=sha
-                )
-            except Exception as e:
-                print(f"Failed to apply fix to {fix.file_path}: {str(e)}")
+        # Upload the fixed files as blobs in parallel
+        blobs: List[Optional[GitBlob]] = []
+        if fixes:
+            with ThreadPoolExecutor(max_workers=min(MAX_FIX_WORKERS, len(fixes))) as executor:
+                blobs = list(executor.map(lambda fix: self._create_blob(repo, fix), fixes))
+        applied = [fix for fix, blob in zip(fixes, blobs, strict=True) if blob is not None]
+        if not applied:
+            raise ValueError("None of the fixes could be applied")
+        
+        # Commit all fixes as one tree; a later fix to the same path wins
+        tree_elements = {
+            fix.file_path: InputGitTreeElement(
+                path=fix.file_path,
+                mode=fixed_file_mode(existing_modes, fix.file_path),
+                type="blob",
+                sha=blob.sha,
+            )
+            for fix, blob in zip(fixes, blobs, strict=True)
+            if blob is not None
+        }
+        tree = repo.create_git_tree(list(tree_elements.values()), base_tree=base_commit.tree)
+        commit = repo.create_git_commit(
+            message=generate_commit_message(applied),
+            tree=tree,
+            parents=[base_commit]
+        )
+        
+        # Create the branch for the fixes at the new commit
+        branch_name = FIXES_BRANCH
+        self.create_branch(repo, branch_name, commit.sha)
                 
         # Create pull request
-        pr_title = "🚨 Lighthouse Performance Improvements"
-        pr_body = self._generate_pr_description(fixes)
+        pr_title = PR_TITLE
+        pr_body = generate_pr_description(applied)
         
         return self.create_pull_request(
             repo=repo,
@@ -190,46 +312,18 @@ class GitHubIntegration:
             draft=True  # Create as draft PR for review
         )
         
-    def _generate_pr_description(self, fixes: List[CodeFix]) -> str:
-        """Generate a detailed pull request description.
+    def _create_blob(self, repo: Repository, fix: CodeFix) -> Optional[GitBlob]:
+        """Upload the fixed content of a file as a Git blob.
         
         Args:
-            fixes: List of applied fixes
+            repo: GitHub Repository object
+            fix: The fix to upload
             
         Returns:
-            Formatted PR description
+            Created GitBlob, or None if the upload failed
         """
-        description = [
-            "# 🚨 Lighthouse Performance Improvements",
-            "\nThis PR contains automated fixes for issues identified by Lighthouse audits.\n",
-            "## 🔧 Changes Made\n"
-        ]
-        
-        # Group fixes by file
-        fixes_by_file: Dict[str, List[CodeFix]] = {}
-        for fix in fixes:
-            if fix.file_path not in fixes_by_file:
-                fixes_by_file[fix.file_path] = []
-            fixes_by_file[fix.file_path].append(fix)
-            
-        # Add details for each file
-        for file_path, file_fixes in fixes_by_file.items():
-            description.append(f"\n### 📄 `{file_path}`\n")
-            for fix in file_fixes:
-                description.extend([
-                    f"- **{fix.issue_title}**",
-                    f"  - {fix.description}\n"
-                ])
-                
-        description.extend([
-            "\n## 🔍 Review Notes",
-            "- This PR was automatically generated by the Lighthouse Auditor",
-            "- Please review the changes carefully before merging",
-            "- Test the changes to ensure no regressions",
-            "\n## 📊 Expected Improvements",
-            "- Improved performance metrics",
-            "- Better accessibility compliance",
-            "- Enhanced SEO optimization"
-        ])
-        
-        return "\n".join(description)
+        try:
+            return repo.create_git_blob(fix.fixed_content, "utf-8")
+        except Exception as e:
+            print(f"Failed to apply fix to {fix.file_path}: {str(e)}")
+            return None
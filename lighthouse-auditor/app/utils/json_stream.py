@@ -0,0 +1,180 @@
+"""Incremental decoding of large JSON documents."""
+
+import json
+import re
+from collections.abc import Iterator
+from typing import IO, Any
+
+JSON_DECODER = json.JSONDecoder()
+_NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+
+# Characters read from a stream at a time
+READ_SIZE = 1 << 16
+
+
+class JsonStreamReader:
+    """Reads a JSON document one value at a time.
+
+    A stream is read in blocks and text is dropped once it has been decoded,
+    so memory use is bounded by the largest value decoded at once rather than
+    by the document. A string is read in place.
+    """
+
+    def __init__(self, source: str | IO[str], read_size: int = READ_SIZE) -> None:
+        self._stream: IO[str] | None
+        if isinstance(source, str):
+            self._text, self._stream = source, None
+        else:
+            self._text, self._stream = "", source
+        self._pos = 0
+        self._read_size = read_size
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._text, self._pos)
+
+    def _read_more(self) -> bool:
+        """Append the next block of the stream to the buffer.
+
+        Returns:
+            False once the stream is exhausted
+        """
+        if self._stream is None:
+            return False
+        # Reading at least as much as is buffered keeps retries on a value
+        # that spans many blocks linear in its size
+        block = self._stream.read(max(self._read_size, len(self._text) - self._pos))
+        if not block:
+            self._stream = None
+            return False
+        self._text = self._text[self._pos :] + block
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character, or "" at the end."""
+        while True:
+            match = _NON_WHITESPACE.search(self._text, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return self._text[self._pos]
+            self._pos = len(self._text)
+            if not self._read_more():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Skip whitespace and consume char.
+
+        Raises:
+            json.JSONDecodeError: If the next character is not char
+        """
+        if self._peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def decode(self) -> Any:
+        """Decode the next value.
+
+        Raises:
+            json.JSONDecodeError: If the next value is not valid JSON
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = JSON_DECODER.raw_decode(self._text, self._pos)
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+                continue
+            # A number ending the buffer may continue in the next block
+            if end < len(self._text) or not self._read_more():
+                self._pos = end
+                return value
+
+    def skip(self) -> None:
+        """Skip the next value, decoding one of its members or elements at a time."""
+        char = self._peek()
+        if char == "{":
+            self._pos += 1
+            first = True
+            while self.next_member(first) is not None:
+                self.decode()
+                first = False
+        elif char == "[":
+            self._pos += 1
+            first = True
+            while self.next_item(first):
+                self.decode()
+                first = False
+        else:
+            self.decode()
+
+    def next_member(self, first: bool) -> str | None:
+        """Read the next key of an object whose opening brace was consumed.
+
+        Returns:
+            The key, with the reader positioned at its value, or None once the
+            closing brace has been consumed
+        """
+        if self._peek() == "}":
+            self._pos += 1
+            return None
+        if not first:
+            self.expect(",")
+        key = self.decode()
+        if not isinstance(key, str):
+            raise self._error("Expecting property name")
+        self.expect(":")
+        return key
+
+    def next_item(self, first: bool) -> bool:
+        """Move to the next element of an array whose opening bracket was consumed.
+
+        Returns:
+            True if an element follows, or False once the closing bracket has
+            been consumed
+        """
+        if self._peek() == "]":
+            self._pos += 1
+            return False
+        if not first:
+            self.expect(",")
+        return True
+
+
+def iter_array(source: str | IO[str], read_size: int = READ_SIZE) -> Iterator[Any]:
+    """Decode a JSON array one element at a time.
+
+    Raises:
+        json.JSONDecodeError: If the source is not a well-formed JSON array
+    """
+    reader = JsonStreamReader(source, read_size)
+    reader.expect("[")
+    first = True
+    while reader.next_item(first):
+        yield reader.decode()
+        first = False
+
+
+def iter_object_members(
+    source: str | IO[str], key: str, read_size: int = READ_SIZE
+) -> Iterator[tuple[str, Any]]:
+    """Decode the members of the object under key in a JSON object one at a time.
+
+    Fields before key are skipped and nothing after it is read.
+
+    Raises:
+        json.JSONDecodeError: If the source is not a well-formed JSON object
+    """
+    reader = JsonStreamReader(source, read_size)
+    reader.expect("{")
+    name = reader.next_member(first=True)
+    while name is not None:
+        if name == key:
+            reader.expect("{")
+            member = reader.next_member(first=True)
+            while member is not None:
+                yield member, reader.decode()
+                member = reader.next_member(first=False)
+            return
+        reader.skip()
+        name = reader.next_member(first=False)
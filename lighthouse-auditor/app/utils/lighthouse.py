@@ -1,16 +1,76 @@
 """Lighthouse audit utilities and tools."""
 
-import json
+import gzip
+import hashlib
 import os
+import select
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import IO, Any, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
-from urllib.parse import urlparse
+from importlib import resources
 
+import orjson
+import tiktoken
 from bs4 import BeautifulSoup
-from pydantic import BaseModel
+# Imported from pydantic.main so mypyc can resolve BaseModel's module
+from pydantic.main import BaseModel
+
+from app.utils.json_stream import iter_object_members
+
+try:
+    from lxml import etree as lxml_etree
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional; BeautifulSoup is used without it
+    lxml_etree = lxml_html = None
+
+AuditItems = Iterable[Tuple[str, Dict[str, Any]]]
+
+# Node script that keeps Chrome and Lighthouse warm between audits. Located
+# through the package rather than __file__, which compiled builds lack.
+WORKER_SCRIPT = resources.files(__name__.rpartition(".")[0]) / "lighthouse_worker.mjs"
+
+# Fields of audit detail items that hold suggestions and code, in priority order
+SUGGESTION_KEYS = ("suggestion", "recommendation", "message")
+SNIPPET_KEYS = ("snippet", "source", "code")
+
+# Report chunks are sized in tokens of this encoding. When it cannot be
+# loaded, tokens are estimated as CHARS_PER_TOKEN bytes of JSON each.
+CHUNK_ENCODING = "cl100k_base"
+CHARS_PER_TOKEN = 4
+DEFAULT_CHUNK_TOKENS = 2000
+
+# LighthouseConfig fields that change how audits run but not their results
+RUNNER_ONLY_FIELDS = {
+    "persistent_worker",
+    "worker_timeout",
+    "max_concurrency",
+    "keep_profile",
+    "cache_ttl",
+}
+
+# Chrome profiles go on tmpfs when it has room for them
+SHM_DIR = Path("/dev/shm")
+SHM_MIN_FREE_BYTES = 512 * 1024 * 1024
+
+CHROME_FLAGS = [
+    "--headless",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-software-rasterizer",
+]
 
 
 class LighthouseConfig(BaseModel):
@@ -24,9 +84,19 @@ class LighthouseConfig(BaseModel):
         "cpuSlowdownMultiplier": 4,
         "networkSlowdownMultiplier": 2,
     }
-
-
-@dataclass
+    # Reuse one Node process and Chrome instance across audits
+    persistent_worker: bool = True
+    # Seconds to wait for the persistent worker to answer before falling back to the CLI
+    worker_timeout: float = 300
+    # Upper bound on parallel audits in run_audits (defaults to the CPU count)
+    max_concurrency: Optional[int] = None
+    # Keep CLI Chrome profiles under audits/tmp for debugging instead of deleting them
+    keep_profile: bool = False
+    # Seconds a report cached under audits/cache is reused for; 0 disables the cache
+    cache_ttl: float = 3600
+
+
+@dataclass(slots=True)
 class AuditIssue:
     """Represents a Lighthouse audit issue."""
 
@@ -48,70 +118,294 @@ class LighthouseRunner:
         # Set environment variable for chrome-launcher
         chrome_path = "/usr/bin/google-chrome"
         os.environ["CHROME_PATH"] = chrome_path
-
-    def run_audit(self, url: str, output_path: Optional[str] = None) -> Dict[str, Any]:
+        self._worker: Optional["subprocess.Popen[bytes]"] = None
+        # Requests to the worker are answered in order, one at a time
+        self._worker_lock = threading.Lock()
+        # Resolved once; the working directory is fixed for the process
+        self._lighthouse_bin = str(Path.cwd() / "node_modules" / ".bin" / "lighthouse")
+        self._chrome_flags = " ".join(CHROME_FLAGS)
+        self._audits_dir = Path("audits")
+        self._profile_root = _profile_root()
+
+    def run_audit(
+        self, url: str, output_path: Optional[str] = None, use_cache: bool = True
+    ) -> Dict[str, Any]:
         """Run a Lighthouse audit on the specified URL.
         
+        Audits run in a persistent worker that keeps Chrome open between calls
+        when config.persistent_worker is set, falling back to the Lighthouse
+        CLI if the worker cannot be started. Reports for the same URL and
+        configuration are reused for config.cache_ttl seconds.
+        
         Args:
             url: The URL to audit
-            output_path: Optional path to save the report. If not provided, a default will be used.
+            output_path: Optional path to save the report. If not provided, the
+                report is only returned and never written to disk.
+            use_cache: Whether a fresh cached report may be returned instead of
+                running a new audit
             
         Returns:
-            Dict containing the audit results
+            Dict containing the audit results, limited to the audits of
+            config.only_categories when it is set
         """
 
         run_timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        user_data_dir = Path("audits") / "tmp" / f"chrome-profile_{run_timestamp}"
-        user_data_dir.mkdir(parents=True, exist_ok=True)
-        absolute_user_data_path = user_data_dir.resolve()
-
-
-        # Use absolute paths and additional Chrome flags
-        chrome_launcher_config = {
-            "chromePath": "/usr/bin/google-chrome",
-            "chromeFlags": [
-                "--headless",
-                "--no-sandbox",
-                "--disable-gpu",
-                "--disable-dev-shm-usage",
-                "--disable-software-rasterizer",
-                f"--user-data-dir={absolute_user_data_path}",
-            ],
-        }
-
-        # If no output path is provided, create a default one in the 'audits' directory
-        if not output_path:
-            # Sanitize URL to use as a filename
-            parsed_url = urlparse(url)
-            sanitized_filename = f"{parsed_url.netloc.replace('.', '_')}_{run_timestamp}.json"
-            
-            # Define the new audits directory relative to the current working directory
-            audits_dir = Path("audits")
-            audits_dir.mkdir(parents=True, exist_ok=True) # Ensure the directory exists
-            output_path = audits_dir / sanitized_filename
 
-        else:
+        final_output_path: Optional[Path] = None
+        if output_path:
             # Convert Windows-style paths to Linux if needed
-            output_path = Path(str(output_path).replace('\\', '/'))
-            if ':' in str(output_path):  # Remove Windows drive letter if present
-                output_path = Path(str(output_path).split(':', 1)[1])
+            report_path = Path(str(output_path).replace('\\', '/'))
+            if ':' in str(report_path):  # Remove Windows drive letter if present
+                report_path = Path(str(report_path).split(':', 1)[1])
             # Ensure the output directory exists
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Ensure output_path is absolute for the lighthouse command
+            final_output_path = report_path.resolve()
+
+            print(f"Saving Lighthouse report to: {final_output_path}")
+
+        use_cache = use_cache and self.config.cache_ttl > 0
+        if use_cache and (report := self._load_cached_report(url)) is not None:
+            print(f"Using cached Lighthouse report for {url}")
+            if final_output_path is not None:
+                final_output_path.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        else:
+            report = self._run_uncached(url, final_output_path, run_timestamp)
+            if use_cache:
+                self._store_cached_report(url, report)
+
+        # Drop audits outside the requested categories so chunking skips them
+        if self.config.only_categories:
+            report = ReportChunker.filter_report(report, self.config.only_categories)
+        return report
+
+    def run_audit_chunks(
+        self,
+        url: str,
+        output_path: str | None = None,
+        use_cache: bool = True,
+        *,
+        max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    ) -> Iterator[dict[str, Any]]:
+        """Run a Lighthouse audit on the specified URL and split the report into chunks.
+
+        A fresh cached report is chunked straight from the cache file one
+        audit at a time, so the whole report is never loaded. Otherwise this
+        is run_audit() followed by ReportChunker.chunk_report().
+
+        Args:
+            url: The URL to audit
+            output_path: Optional path to save the report
+            use_cache: Whether a fresh cached report may be used instead of
+                running a new audit
+            max_tokens: Maximum size of each chunk in tokens
 
-        # Get absolute path for lighthouse executable
-        lighthouse_path = os.path.join(os.getcwd(), "node_modules", ".bin", "lighthouse")
+        Returns:
+            Iterator of report chunks
+        """
+        # Reports saved to output_path are written by run_audit
+        if output_path is None and use_cache and self.config.cache_ttl > 0:
+            cache_path = self._fresh_cache_path(url)
+            if cache_path is not None:
+                print(f"Using cached Lighthouse report for {url}")
+                return self._chunk_saved_report(cache_path, max_tokens)
+
+        report = self.run_audit(url, output_path, use_cache)
+        return ReportChunker.chunk_report(report, max_tokens=max_tokens)
+
+    def _chunk_saved_report(self, report_path: Path, max_tokens: int) -> Iterator[dict[str, Any]]:
+        """Chunk a saved report without loading it, like run_audit would filter it."""
+        audits: AuditItems = self.iter_audits(report_path)
+        if self.config.only_categories:
+            # Categories follow the audits, so they are read in a pass of their own
+            with _open_report(report_path) as f:
+                report_categories = dict(iter_object_members(f, "categories"))
+            wanted = ReportChunker.category_audit_ids(
+                report_categories, self.config.only_categories
+            )
+            if wanted:
+                audits = (
+                    (audit_id, audit_data)
+                    for audit_id, audit_data in audits
+                    if audit_id in wanted
+                )
+        return ReportChunker.chunk_audits(audits, max_tokens=max_tokens)
+
+    def _run_uncached(
+        self, url: str, final_output_path: Optional[Path], run_timestamp: str
+    ) -> Dict[str, Any]:
+        """Run an audit in the worker or, failing that, with the CLI."""
+        if self.config.persistent_worker:
+            with self._worker_lock:
+                try:
+                    report: dict[str, Any] | None = self._run_in_worker(url)
+                except OSError as e:
+                    print(f"Lighthouse worker unavailable, falling back to the CLI: {str(e)}")
+                    # Unread output would otherwise be taken as the next answer
+                    self.close()
+                    report = None
+            if report is not None:
+                if final_output_path is not None:
+                    final_output_path.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+                return report
+
+        return self._run_cli(url, final_output_path, run_timestamp)
+
+    def run_audits(
+        self, urls: List[str], concurrency: Optional[int] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Run Lighthouse audits on several URLs in parallel.
+        
+        Each worker process owns its own Chrome instance. Performance metrics
+        degrade when audits compete for CPU, so pass concurrency=1 to run
+        performance-critical audits serially.
         
-        # Ensure output_path is absolute for the lighthouse command
-        final_output_path = Path(output_path).resolve()
+        Args:
+            urls: The URLs to audit
+            concurrency: Maximum number of parallel audits. Defaults to
+                config.max_concurrency, or the CPU count if that is unset.
+            
+        Returns:
+            Iterator of (url, audit results) pairs in completion order
+        """
+        if not urls:
+            return
+        concurrency = min(
+            len(urls), concurrency or self.config.max_concurrency or os.cpu_count() or 1
+        )
+
+        if concurrency == 1:
+            for url in urls:
+                yield url, self.run_audit(url)
+            return
+
+        executor = ProcessPoolExecutor(
+            max_workers=concurrency,
+            initializer=_init_audit_process,
+            initargs=(self.config.model_dump(),),
+        )
+        try:
+            futures = {executor.submit(_run_audit_in_process, url): url for url in urls}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def _cache_path(self, url: str) -> Path:
+        """Path of the cached report for url under the current configuration."""
+        # Settings that only change how audits run do not affect the report
+        config_json = self.config.model_dump_json(exclude=RUNNER_ONLY_FIELDS)
+        digest = hashlib.blake2b(f"{url}|{config_json}".encode(), digest_size=20).hexdigest()
+        return self._audits_dir / "cache" / f"{digest}.json.gz"
+
+    def _fresh_cache_path(self, url: str) -> Path | None:
+        """Return the path of the cached report for url if it is fresh, else None."""
+        cache_path = self._cache_path(url)
+        try:
+            if time.time() - cache_path.stat().st_mtime < self.config.cache_ttl:
+                return cache_path
+        except OSError:
+            pass
+        return None
+
+    def _load_cached_report(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached report for url if it is fresh, else None."""
+        cache_path = self._fresh_cache_path(url)
+        if cache_path is None:
+            return None
+        try:
+            return orjson.loads(gzip.decompress(cache_path.read_bytes()))
+        except (OSError, EOFError, zlib.error, orjson.JSONDecodeError):
+            return None
+
+    def _store_cached_report(self, url: str, report: Dict[str, Any]) -> None:
+        """Cache a report, replacing any previous entry atomically."""
+        cache_path = self._cache_path(url)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(gzip.compress(orjson.dumps(report), compresslevel=6))
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"Warning: could not cache Lighthouse report: {str(e)}")
+
+    def _run_in_worker(self, url: str) -> Dict[str, Any]:
+        """Run an audit in the persistent worker, starting it if needed.
+        
+        Raises:
+            OSError: If the worker cannot be started, does not answer within
+                config.worker_timeout seconds, or sends an invalid answer
+            RuntimeError: If the worker ran the audit and it failed
+        """
+        worker = self._worker
+        if worker is None or worker.poll() is not None:
+            worker = self._worker = subprocess.Popen(
+                ["node", str(WORKER_SCRIPT), orjson.dumps(CHROME_FLAGS).decode()],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+
+        if worker.stdin is None or worker.stdout is None:
+            raise ConnectionError("Lighthouse worker pipes are not open")
+
+        request = {"url": url, "onlyCategories": self.config.only_categories}
+        worker.stdin.write(orjson.dumps(request) + b"\n")
+        worker.stdin.flush()
 
-        print(f"Saving Lighthouse report to: {final_output_path}")
+        line = _read_line(worker.stdout, self.config.worker_timeout)
+        if not line:
+            raise ConnectionError("Lighthouse worker exited before responding")
 
+        try:
+            response = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            raise ConnectionError(f"Lighthouse worker sent invalid JSON: {e!s}") from e
+        if not isinstance(response, dict) or not ("lhr" in response or "error" in response):
+            raise ConnectionError("Lighthouse worker sent an unexpected response")
+        if "error" in response:
+            raise RuntimeError(f"Lighthouse audit failed. Error: {response['error']}")
+        return response["lhr"]
+
+    def _run_cli(self, url: str, final_output_path: Optional[Path], run_timestamp: str) -> Dict[str, Any]:
+        """Run an audit with a one-off Lighthouse CLI process."""
+        with self._chrome_profile(run_timestamp) as user_data_dir:
+            return self._run_lighthouse_cli(url, final_output_path, user_data_dir)
+
+    def _chrome_profile(self, run_timestamp: str) -> ContextManager[str]:
+        """Return a context manager yielding the Chrome profile directory for one run.
+        
+        The profile is a temporary directory, on tmpfs when available, that is
+        deleted afterwards unless config.keep_profile is set.
+        """
+        if not self.config.keep_profile:
+            return tempfile.TemporaryDirectory(
+                prefix="chrome-profile_", dir=self._profile_root, ignore_cleanup_errors=True
+            )
+
+        # The PID keeps profiles apart when run_audits runs audits in parallel
+        user_data_dir = self._audits_dir / "tmp" / f"chrome-profile_{run_timestamp}_{os.getpid()}"
+        user_data_dir.mkdir(parents=True, exist_ok=True)
+        return nullcontext(str(user_data_dir.resolve()))
+
+    def _run_lighthouse_cli(
+        self, url: str, final_output_path: Optional[Path], absolute_user_data_path: str
+    ) -> Dict[str, Any]:
+        """Run the Lighthouse CLI with the given Chrome profile directory.
+        
+        The report is read from stdout unless it is being saved to a file.
+        """
         command = [
-            lighthouse_path,
+            self._lighthouse_bin,
             url,
             "--output=json",
-            f"--output-path={final_output_path}",
-            f"--chrome-flags={' '.join(chrome_launcher_config['chromeFlags'])}",
+            f"--output-path={final_output_path or 'stdout'}",
+            f"--chrome-flags={self._chrome_flags} --user-data-dir={absolute_user_data_path}",
             "--quiet",
         ]
 
@@ -119,61 +413,127 @@ class LighthouseRunner:
         if self.config.only_categories:
             command.append("--only-categories=" + ",".join(self.config.only_categories))
 
+        print("Executing command:", " ".join(command))
+        result = subprocess.run(command, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"Lighthouse audit failed. Error: {result.stderr.decode(errors='replace')}\n"
+                f"Output: {result.stdout.decode(errors='replace')}"
+            )
+
+        if final_output_path is None:
+            output = result.stdout
+            if not output.strip():
+                raise RuntimeError("Lighthouse ran but produced no output.")
+        elif final_output_path.exists():
+            output = final_output_path.read_bytes()
+        else:
+            raise RuntimeError("Lighthouse ran but the output file was not found.")
+
         try:
-            print("Executing command:", " ".join(command))
-            subprocess.run(command, capture_output=True, text=True, check=True)
+            return orjson.loads(output)
+        except orjson.JSONDecodeError:
+            source = final_output_path or "stdout"
+            raise RuntimeError(f"Failed to parse Lighthouse output from {source}")
+
+    def close(self) -> None:
+        """Stop the persistent worker and the Chrome instance it owns."""
+        if self._worker is None:
+            return
+        worker, self._worker = self._worker, None
+        try:
+            # Closing stdin lets the worker shut Chrome down cleanly
+            if worker.stdin is not None:
+                worker.stdin.close()
+            worker.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            worker.kill()
+
+    @staticmethod
+    def iter_audits(report_path: Union[str, Path]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (audit_id, audit_data) pairs from a saved report one at a time.
+
+        The report is read in blocks and only one audit is decoded at a time,
+        so memory use does not grow with the size of the report. Nothing after
+        the audits is read. Reports ending in .gz are decompressed as they are
+        read.
+        
+        Args:
+            report_path: Path to a Lighthouse JSON report
             
-            # Since we are now always saving to a file, read the result from the file
-            if final_output_path.exists():
-                with open(final_output_path, 'r') as f:
-                    return json.load(f)
-            else:
-                 raise RuntimeError("Lighthouse ran but the output file was not found.")
-
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Lighthouse audit failed. Error: {e.stderr}\nOutput: {e.stdout}")
-        except json.JSONDecodeError:
-            raise RuntimeError(f"Failed to parse Lighthouse output from file: {final_output_path}")
-
-    def extract_issues(self, report: Union[str, Dict[str, Any]]) -> List[AuditIssue]:
+        Returns:
+            Iterator of (audit_id, audit_data) pairs
+            
+        Raises:
+            json.JSONDecodeError: If the file is not a well-formed report
+        """
+        with _open_report(Path(report_path)) as f:
+            yield from iter_object_members(f, "audits")
+
+    def extract_issues(
+        self, report: Union[str, Dict[str, Any], AuditItems]
+    ) -> List[AuditIssue]:
         """Extract actionable issues from a Lighthouse report.
         
         Args:
-            report: Either a JSON string or dict containing the Lighthouse report
+            report: A JSON string or dict containing the Lighthouse report, or an
+                iterable of (audit_id, audit_data) pairs such as iter_audits()
             
         Returns:
             List of AuditIssue objects
         """
         if isinstance(report, str):
             try:
-                report_data = json.loads(report)
-            except json.JSONDecodeError:
+                report = orjson.loads(report)
+            except orjson.JSONDecodeError:
                 raise ValueError("Invalid JSON report")
-        else:
-            report_data = report
+
+        audits = report.get("audits", {}).items() if isinstance(report, dict) else report
 
         issues = []
-        audits = report_data.get("audits", {})
-
-        for audit_id, audit_data in audits.items():
-            if audit_data.get("score", 1) is not None and audit_data.get("score", 1) < 1:  # Only process failed audits
-                issue = AuditIssue(
-                    title=audit_data.get("title", "Unknown Issue"),
-                    description=audit_data.get("description", ""),
-                    score=audit_data.get("score", 0),
-                    impact=self._calculate_impact(audit_data),
-                    suggestions=self._extract_suggestions(audit_data),
-                    code_snippet=self._extract_code_snippet(audit_data),
-                )
-                issues.append(issue)
 
-        return issues
+        for audit_id, audit_data in audits:
+            score = audit_data.get("score")
+            # Only process failed audits
+            if score is None or score >= 1:
+                continue
+
+            description = audit_data.get("description")
+            suggestions = [] if description is None else [description]
+
+            # Collect suggestions and the first code snippet in one pass over the items
+            code_snippet = None
+            for item in (audit_data.get("details") or {}).get("items") or ():
+                if not isinstance(item, dict):
+                    continue
+                for key in SUGGESTION_KEYS:
+                    if key in item:
+                        suggestions.append(item[key])
+                if code_snippet is None:
+                    for key in SNIPPET_KEYS:
+                        if key in item:
+                            code_snippet = self._clean_snippet(item[key])
+                            break
+
+            title = audit_data.get("title", "Unknown Issue")
+            if isinstance(title, str):
+                # Titles repeat across reports, so share one copy of each
+                title = sys.intern(title)
+
+            issues.append(AuditIssue(
+                title=title,
+                description="" if description is None else description,
+                score=score,
+                impact=self._calculate_impact(score, audit_data.get("weight", 0)),
+                # Remove duplicates, keeping the most relevant (first) occurrence
+                suggestions=list(dict.fromkeys(suggestions)) if len(suggestions) > 1 else suggestions,
+                code_snippet=code_snippet,
+            ))
 
-    def _calculate_impact(self, audit_data: Dict[str, Any]) -> str:
-        """Calculate the impact level of an audit issue."""
-        score = audit_data.get("score", 0)
-        weight = audit_data.get("weight", 0)
+        return issues
 
+    def _calculate_impact(self, score: float, weight: float) -> str:
+        """Calculate the impact level of an audit issue from its score and weight."""
         if score < 0.5 and weight > 3:
             return "high"
         elif score < 0.8:
@@ -181,74 +541,237 @@ class LighthouseRunner:
         else:
             return "low"
 
-    def _extract_suggestions(self, audit_data: Dict[str, Any]) -> List[str]:
-        """Extract improvement suggestions from audit data."""
-        suggestions = []
+    def _clean_snippet(self, snippet: Any) -> str:
+        """Convert a code snippet from audit details to plain text."""
+        if not isinstance(snippet, str):
+            return str(snippet)
+        # Most snippets are selectors or URLs with no markup to strip
+        if "<" not in snippet and "&" not in snippet:
+            return snippet
 
-        # Extract from description
-        if "description" in audit_data:
-            suggestions.append(audit_data["description"])
+        # Clean HTML if present
+        if lxml_html is not None:
+            try:
+                return lxml_html.fragment_fromstring(snippet, create_parent="div").text_content()
+            except lxml_etree.LxmlError:
+                pass
+        return BeautifulSoup(snippet, "html.parser").get_text()
+
+
+def _profile_root() -> Optional[str]:
+    """Pick where temporary Chrome profiles go: tmpfs if it has room, else the system default."""
+    try:
+        if shutil.disk_usage(SHM_DIR).free >= SHM_MIN_FREE_BYTES:
+            return str(SHM_DIR)
+    except OSError:
+        pass
+    return None
+
+
+def _read_line(stream: IO[bytes], timeout: float) -> bytes:
+    """Read one line from a pipe, giving up after timeout seconds.
+
+    Returns:
+        The line including its newline, or what was read before end of file
+
+    Raises:
+        TimeoutError: If no complete line arrives in time
+    """
+    deadline = time.monotonic() + timeout
+    fd = stream.fileno()
+    data = bytearray()
+    while not data.endswith(b"\n"):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            raise TimeoutError(f"Lighthouse worker did not respond within {timeout:g}s")
+        # Read the pipe directly; buffered reads could block past the deadline
+        block = os.read(fd, 1 << 16)
+        if not block:
+            break
+        data += block
+    return bytes(data)
+
+
+def _open_report(report_path: Path) -> IO[str]:
+    """Open a saved report for reading, decompressing it if it ends in .gz."""
+    if report_path.suffix == ".gz":
+        return gzip.open(report_path, "rt", encoding="utf-8")
+    return report_path.open(encoding="utf-8")
+
+
+@lru_cache(maxsize=1)
+def _token_encoding() -> Optional[tiktoken.Encoding]:
+    """Load the tokenizer used to size report chunks, once per process."""
+    try:
+        return tiktoken.get_encoding(CHUNK_ENCODING)
+    except Exception as e:
+        # The encoding is downloaded on first use, which fails offline
+        print(f"Warning: {CHUNK_ENCODING} unavailable, estimating tokens from size: {str(e)}")
+        return None
 
-        # Extract from details
-        details = audit_data.get("details", {})
-        if "items" in details:
-            for item in details["items"]:
-                if isinstance(item, dict):
-                    for key in ["suggestion", "recommendation", "message"]:
-                        if key in item:
-                            suggestions.append(item[key])
 
-        return list(set(suggestions))  # Remove duplicates
+def _count_tokens(audit_data: Any) -> int:
+    """Count the tokens in an audit's compact JSON."""
+    serialized = orjson.dumps(audit_data)
+    encoding = _token_encoding()
+    if encoding is None:
+        return -(-len(serialized) // CHARS_PER_TOKEN)
+    return len(encoding.encode_ordinary(serialized.decode()))
 
-    def _extract_code_snippet(self, audit_data: Dict[str, Any]) -> Optional[str]:
-        """Extract relevant code snippet from audit data if available."""
-        details = audit_data.get("details", {})
 
-        # Try to find code snippets in items
-        if "items" in details:
-            for item in details["items"]:
-                if isinstance(item, dict):
-                    # Look for common code-related fields
-                    for key in ["snippet", "source", "code"]:
-                        if key in item:
-                            # Clean HTML if present
-                            snippet = item[key]
-                            if isinstance(snippet, str):
-                                soup = BeautifulSoup(snippet, "html.parser")
-                                return soup.get_text()
-                            return str(snippet)
+# Runner owned by each run_audits worker process
+_process_runner: Optional[LighthouseRunner] = None
 
-        return None
+
+def _init_audit_process(config: Dict[str, Any]) -> None:
+    """Create the LighthouseRunner used by a run_audits worker process."""
+    global _process_runner
+    _process_runner = LighthouseRunner(LighthouseConfig(**config))
+
+
+def _run_audit_in_process(url: str) -> Dict[str, Any]:
+    """Run one audit with this worker process's LighthouseRunner."""
+    if _process_runner is None:
+        raise RuntimeError("Audit process was not initialized")
+    return _process_runner.run_audit(url)
 
 
 class ReportChunker:
     """Handles chunking large Lighthouse reports into manageable pieces."""
 
+    @staticmethod
+    def filter_report(report: Dict[str, Any], categories: Iterable[str]) -> Dict[str, Any]:
+        """Keep only the audits referenced by the given categories.
+        
+        Args:
+            report: The full Lighthouse report
+            categories: IDs of the categories to keep, e.g. ["performance"]
+            
+        Returns:
+            Shallow copy of the report with unreferenced audits removed, or the
+            report itself if none of the categories are present
+        """
+        wanted = ReportChunker.category_audit_ids(report.get("categories") or {}, categories)
+        if not wanted:
+            return report
+
+        return {
+            **report,
+            "audits": {
+                audit_id: audit_data
+                for audit_id, audit_data in report.get("audits", {}).items()
+                if audit_id in wanted
+            },
+        }
+
+    @staticmethod
+    def category_audit_ids(
+        report_categories: dict[str, Any], categories: Iterable[str]
+    ) -> set[str]:
+        """Collect the IDs of the audits referenced by the given categories.
+
+        Args:
+            report_categories: The "categories" object of a report
+            categories: IDs of the categories to look up
+
+        Returns:
+            Set of audit IDs, empty if none of the categories are present
+        """
+        return {
+            ref["id"]
+            for category in categories
+            for ref in (report_categories.get(category) or {}).get("auditRefs", ())
+        }
+
+    @staticmethod
+    def measure_audits(report: Dict[str, Any]) -> Dict[str, int]:
+        """Count the tokens of every audit in a report.
+        
+        Pass the result as audit_sizes when chunking the same report more than
+        once, e.g. with different max_tokens values.
+        
+        Args:
+            report: The full Lighthouse report
+            
+        Returns:
+            Dict mapping audit IDs to their size in tokens
+        """
+        return {
+            audit_id: _count_tokens(audit_data)
+            for audit_id, audit_data in report.get("audits", {}).items()
+        }
+
     @staticmethod
     def chunk_report(
-        report: Dict[str, Any], max_chunk_size: int = 8000
-    ) -> List[Dict[str, Any]]:
+        report: Dict[str, Any],
+        max_chunk_size: Optional[int] = None,
+        *,
+        max_tokens: int = DEFAULT_CHUNK_TOKENS,
+        audit_sizes: Optional[Dict[str, int]] = None,
+    ) -> Iterator[Dict[str, Any]]:
         """Split a large report into smaller chunks while maintaining context.
         
         Args:
             report: The full Lighthouse report
-            max_chunk_size: Maximum size of each chunk in characters
+            max_chunk_size: Deprecated character budget, converted to tokens
+                and used instead of max_tokens when given
+            max_tokens: Maximum size of each chunk in tokens
+            audit_sizes: Optional precomputed sizes from measure_audits()
             
         Returns:
-            List of report chunks
+            Iterator of report chunks; wrap in list() to keep them all
         """
-        chunks = []
-        current_chunk = {"metadata": report.get("metadata", {}), "audits": {}}
+        if max_chunk_size is not None:
+            warnings.warn(
+                "max_chunk_size is deprecated; pass max_tokens instead",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            max_tokens = max_chunk_size // CHARS_PER_TOKEN
+        return ReportChunker.chunk_audits(
+            report.get("audits", {}).items(),
+            report.get("metadata", {}),
+            max_tokens=max_tokens,
+            audit_sizes=audit_sizes,
+        )
+
+    @staticmethod
+    def chunk_audits(
+        audits: AuditItems,
+        metadata: Optional[Dict[str, Any]] = None,
+        *,
+        max_tokens: int = DEFAULT_CHUNK_TOKENS,
+        audit_sizes: Optional[Dict[str, int]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Group (audit_id, audit_data) pairs into report chunks.
+        
+        Chunks are yielded as soon as they are full, so consumers can start on
+        the first chunk before the rest are built.
+        
+        Args:
+            audits: Audits to chunk, e.g. from LighthouseRunner.iter_audits()
+            metadata: Metadata attached to every chunk
+            max_tokens: Maximum size of each chunk in tokens
+            audit_sizes: Optional precomputed sizes from measure_audits()
+            
+        Returns:
+            Iterator of report chunks
+        """
+        metadata = metadata or {}
+        audit_sizes = audit_sizes or {}
+        current_chunk = {"metadata": metadata, "audits": {}}
         current_size = 0
 
-        for audit_id, audit_data in report.get("audits", {}).items():
+        for audit_id, audit_data in audits:
             # Estimate size of this audit
-            audit_size = len(json.dumps(audit_data))
+            audit_size = audit_sizes.get(audit_id)
+            if audit_size is None:
+                audit_size = _count_tokens(audit_data)
 
             # If adding this audit would exceed chunk size, start a new chunk
-            if current_size + audit_size > max_chunk_size and current_chunk["audits"]:
-                chunks.append(current_chunk)
-                current_chunk = {"metadata": report.get("metadata", {}), "audits": {}}
+            if current_size + audit_size > max_tokens and current_chunk["audits"]:
+                yield current_chunk
+                current_chunk = {"metadata": metadata, "audits": {}}
                 current_size = 0
 
             # Add audit to current chunk
@@ -257,6 +780,4 @@ class ReportChunker:
 
         # Add final chunk if not empty
         if current_chunk["audits"]:
-            chunks.append(current_chunk)
-
-        return chunks
+            yield current_chunk
@@ -0,0 +1,37 @@
+// Long-lived Lighthouse worker used by LighthouseRunner.
+//
+// Launches Chrome once and keeps it open across audits. Each stdin line is a
+// JSON request {"url": ..., "onlyCategories": [...]}; each is answered with
+// one stdout line holding {"lhr": ...} or {"error": ...}. The worker exits
+// and closes Chrome when stdin is closed.
+//
+// Usage: node lighthouse_worker.mjs '<JSON array of Chrome flags>'
+
+import readline from 'node:readline';
+
+import * as chromeLauncher from 'chrome-launcher';
+import lighthouse from 'lighthouse';
+
+const chromeFlags = JSON.parse(process.argv[2] || '[]');
+const chrome = await chromeLauncher.launch({chromeFlags});
+
+const lines = readline.createInterface({input: process.stdin, crlfDelay: Infinity});
+
+for await (const line of lines) {
+  if (!line.trim()) continue;
+
+  let response;
+  try {
+    const {url, onlyCategories} = JSON.parse(line);
+    const flags = {port: chrome.port, output: 'json', logLevel: 'error'};
+    if (onlyCategories) flags.onlyCategories = onlyCategories;
+
+    const result = await lighthouse(url, flags);
+    response = result ? {lhr: result.lhr} : {error: 'Lighthouse returned no result'};
+  } catch (err) {
+    response = {error: String((err && err.stack) || err)};
+  }
+  process.stdout.write(JSON.stringify(response) + '\n');
+}
+
+await chrome.kill();
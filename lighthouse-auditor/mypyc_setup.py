@@ -0,0 +1,16 @@
+"""Build the report parsing modules as C extensions with mypyc.
+
+Run through ``make compile``. The extensions are built in place next to their
+sources, so no package metadata from pyproject.toml is needed.
+"""
+
+from mypyc.build import mypycify
+from setuptools import setup
+
+setup(
+    name="lighthouse-auditor-native",
+    ext_modules=mypycify(
+        ["app/utils/json_stream.py", "app/utils/lighthouse.py"], separate=True
+    ),
+    packages=[],
+)
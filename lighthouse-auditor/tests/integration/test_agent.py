@@ -13,10 +13,13 @@
 # limitations under the License.
 
 # mypy: disable-error-code="union-attr"
+import pytest
+
 from app.agent import agent
 
 
-def test_agent_stream() -> None:
+@pytest.mark.asyncio
+async def test_agent_stream() -> None:
     """
     Integration test for the agent stream functionality.
     Tests that the agent returns valid streaming responses.
@@ -30,7 +33,8 @@ def test_agent_stream() -> None:
     }
 
     events = [
-        message for message, _ in agent.stream(input_dict, stream_mode="messages")
+        message
+        async for message, _ in agent.astream(input_dict, stream_mode="messages")
     ]
 
     # Verify we get a reasonable number of messages
@@ -0,0 +1,131 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import json
+import os
+from types import ModuleType
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from google.auth.credentials import Credentials
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+FAILED_AUDIT_REPORT = {
+    "audits": {
+        "link-text": {
+            "title": "Links do not have descriptive text",
+            "description": "Use descriptive link text.",
+            "score": 0,
+            "details": {"items": [{"snippet": '<a href="/more">Click here</a>'}]},
+        }
+    }
+}
+
+
+@pytest.fixture(scope="module")
+def agent(tmp_path_factory: pytest.TempPathFactory) -> ModuleType:
+    """Import the agent module with mocked Google Cloud credentials."""
+    cache_path = tmp_path_factory.mktemp("cache") / "tool_results.db"
+    with (
+        patch.dict(os.environ, {"TOOL_CACHE_PATH": str(cache_path)}),
+        patch(
+            "google.auth.default",
+            return_value=(MagicMock(spec=Credentials), "mock-project-id"),
+        ),
+    ):
+        return importlib.import_module("app.agent")
+
+
+def test_propose_fixes_returns_drafts(agent: ModuleType) -> None:
+    """Test that proposed fixes are drafts, not fixes create_github_pr accepts."""
+    result = json.loads(
+        agent.propose_fixes.invoke({"report_input": json.dumps(FAILED_AUDIT_REPORT)})
+    )
+
+    (draft,) = result["needs_completion"]
+    assert draft["issue_title"] == "Links do not have descriptive text"
+    assert draft["code_snippet"] == "Click here"
+    assert "fixed_content" not in draft
+    assert "file_path" not in draft
+
+
+@pytest.mark.asyncio
+async def test_create_github_pr_rejects_incomplete_fixes(agent: ModuleType) -> None:
+    """Test that fixes without a path or new content never reach GitHub."""
+    integration = MagicMock()
+    integration.apply_fixes = AsyncMock()
+    fixes = [
+        {"file_path": "", "fixed_content": "<html></html>", "issue_title": "No path"},
+        {"file_path": "index.html", "fixed_content": "", "issue_title": "No content"},
+    ]
+
+    with patch.object(agent, "github_integration", integration):
+        result = await agent.create_github_pr.ainvoke(
+            {"repo": "owner/repo", "fixes": fixes}
+        )
+
+    assert result.startswith("Error:")
+    assert "No path" in result and "No content" in result
+    integration.apply_fixes.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_github_pr_only_requires_path_and_content(
+    agent: ModuleType,
+) -> None:
+    """Test that fixes without a title, description or original content are applied."""
+    integration = MagicMock()
+    integration.apply_fixes = AsyncMock(return_value={"html_url": "https://pr"})
+    fixes = [{"file_path": "index.html", "fixed_content": "<html></html>"}]
+
+    with patch.object(agent, "github_integration", integration):
+        result = await agent.create_github_pr.ainvoke(
+            {"repo": "owner/repo", "fixes": fixes}
+        )
+
+    assert result == "Created pull request: https://pr"
+    (code_fix,) = integration.apply_fixes.call_args.args[1]
+    assert code_fix.issue_title == "Update index.html"
+    assert code_fix.description == ""
+
+
+def test_truncate_to_budget_keeps_tool_calls_with_results(agent: ModuleType) -> None:
+    """Test that tool results are never kept without the call that produced them."""
+    call = AIMessage(
+        content="w" * 40,
+        tool_calls=[
+            {"name": "run_lighthouse_audit", "args": {}, "id": "1"},
+            {"name": "run_lighthouse_audit", "args": {}, "id": "2"},
+        ],
+    )
+    messages = [
+        HumanMessage(content="Audit these sites"),
+        AIMessage(content="x" * 400),
+        call,
+        ToolMessage(content="y" * 40, tool_call_id="1"),
+        ToolMessage(content="z" * 40, tool_call_id="2"),
+    ]
+
+    # Room for the first message and both results, but not for their call
+    truncated = agent._truncate_to_budget(messages, budget=30)
+
+    assert truncated == [messages[0], call, *messages[3:]]
+
+
+def test_truncate_to_budget_within_budget(agent: ModuleType) -> None:
+    """Test that history within the budget is returned unchanged."""
+    messages = (HumanMessage(content="hi"), AIMessage(content="hello"))
+
+    assert agent._truncate_to_budget(messages, budget=100) == list(messages)
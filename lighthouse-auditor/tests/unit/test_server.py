@@ -16,7 +16,8 @@ import json
 import logging
 import os
 import sys
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -99,10 +100,14 @@ async def test_stream_chat_events() -> None:
 
     mock_events = [{"content": "Mocked response"}, {"content": "Additional response"}]
 
+    async def mock_astream(*args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        for event in mock_events:
+            yield event
+
     # Create a mock agent module
     mock_agent_module = MagicMock()
     mock_agent_module.agent = MagicMock()
-    mock_agent_module.agent.stream.return_value = mock_events
+    mock_agent_module.agent.astream = mock_astream
 
     # Patch the module import
     with patch.dict(sys.modules, {"app.agent": mock_agent_module}):
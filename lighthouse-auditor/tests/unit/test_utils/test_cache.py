@@ -0,0 +1,57 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sqlite3
+from pathlib import Path
+
+from app.utils.cache import ToolResultCache, make_cache_key
+
+
+def test_make_cache_key_ignores_key_order() -> None:
+    """Test that equivalent payloads map to the same cache key."""
+    assert make_cache_key("audit", {"a": 1, "b": 2}) == make_cache_key(
+        "audit", {"b": 2, "a": 1}
+    )
+    assert make_cache_key("audit", {"a": 1}) != make_cache_key("analyze", {"a": 1})
+
+
+def test_tool_result_cache_roundtrip(tmp_path: Path) -> None:
+    """Test that stored values are returned until they expire."""
+    cache = ToolResultCache(tmp_path / "cache.db", ttl=60)
+
+    assert cache.get("missing") is None
+
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+    cache.set("expired", "value", ttl=-1)
+    assert cache.get("expired") is None
+
+
+def test_tool_result_cache_purges_expired_entries(tmp_path: Path) -> None:
+    """Test that expired rows are deleted when values are stored or reopened."""
+    path = tmp_path / "cache.db"
+    cache = ToolResultCache(path, ttl=60)
+
+    def stored_keys() -> list[str]:
+        with sqlite3.connect(path) as conn:
+            return sorted(row[0] for row in conn.execute("SELECT key FROM cache"))
+
+    cache.set("expired", "value", ttl=-1)
+    cache.set("fresh", "value")
+    assert stored_keys() == ["fresh"]
+
+    cache.set("expired", "value", ttl=-1)
+    ToolResultCache(path, ttl=60)
+    assert stored_keys() == ["fresh"]
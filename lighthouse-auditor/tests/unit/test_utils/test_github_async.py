@@ -0,0 +1,126 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import httpx
+import pytest
+
+from app.utils.github_async import GITHUB_API_URL, AsyncGitHubIntegration
+from app.utils.github_integration import CodeFix
+
+
+def make_fix(file_path: str, fixed_content: str = "fixed") -> CodeFix:
+    """Build a fix for the given path."""
+    return CodeFix(
+        file_path=file_path,
+        original_content="original",
+        fixed_content=fixed_content,
+        description=f"Fix {file_path}",
+        issue_title=f"Issue in {file_path}",
+    )
+
+
+class FakeGitHub:
+    """Records requests and answers them like the GitHub REST API."""
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path
+        if path.endswith("/branches/main"):
+            return httpx.Response(
+                200,
+                json={"commit": {"sha": "base", "commit": {"tree": {"sha": "tree"}}}},
+            )
+        if path.endswith("/git/trees/tree"):
+            return httpx.Response(
+                200,
+                json={
+                    "tree": [
+                        {"path": "index.html", "mode": "100644", "type": "blob"},
+                        {"path": "build.sh", "mode": "100755", "type": "blob"},
+                        {"path": "latest", "mode": "120000", "type": "blob"},
+                        {"path": "src", "mode": "040000", "type": "tree"},
+                    ],
+                    "truncated": False,
+                },
+            )
+        if path.endswith("/pulls"):
+            return httpx.Response(201, json={"html_url": "https://github.com/pr/1"})
+        return httpx.Response(201, json={"sha": f"sha-{len(self.requests)}"})
+
+    def install(self, integration: AsyncGitHubIntegration) -> None:
+        """Route the integration's requests to this fake."""
+        integration._client = lambda: httpx.AsyncClient(  # type: ignore[method-assign]
+            base_url=GITHUB_API_URL, transport=httpx.MockTransport(self.handler)
+        )
+
+    def posted(self, suffix: str) -> list[dict]:
+        """Bodies of the POST requests to paths ending with suffix."""
+        return [
+            json.loads(request.content)
+            for request in self.requests
+            if request.method == "POST" and request.url.path.endswith(suffix)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_apply_fixes_skips_unusable_fixes() -> None:
+    """Test that only fixes to existing files with new content are committed.
+
+    Files keep their mode and symbolic links are left alone.
+    """
+    github = FakeGitHub()
+    integration = AsyncGitHubIntegration("token")
+    github.install(integration)
+
+    pr = await integration.apply_fixes(
+        "owner/repo",
+        [
+            make_fix("index.html"),
+            make_fix(""),
+            make_fix("missing.html"),
+            make_fix("src"),
+            make_fix("index.html", fixed_content=""),
+            make_fix("latest"),
+            make_fix("build.sh"),
+        ],
+    )
+
+    assert pr["html_url"] == "https://github.com/pr/1"
+    assert len(github.posted("/git/blobs")) == 2
+    (tree,) = github.posted("/git/trees")
+    assert [(element["path"], element["mode"]) for element in tree["tree"]] == [
+        ("index.html", "100644"),
+        ("build.sh", "100755"),
+    ]
+    (pull,) = github.posted("/pulls")
+    assert "index.html" in pull["body"]
+    assert "missing.html" not in pull["body"]
+
+
+@pytest.mark.asyncio
+async def test_apply_fixes_without_usable_fixes_creates_no_pr() -> None:
+    """Test that no branch or pull request is created when nothing applies."""
+    github = FakeGitHub()
+    integration = AsyncGitHubIntegration("token")
+    github.install(integration)
+
+    with pytest.raises(ValueError):
+        await integration.apply_fixes("owner/repo", [make_fix("missing.html")])
+
+    assert not [request for request in github.requests if request.method == "POST"]
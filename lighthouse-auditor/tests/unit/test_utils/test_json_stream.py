@@ -0,0 +1,85 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import json
+
+import pytest
+
+from app.utils.json_stream import JsonStreamReader, iter_array, iter_object_members
+
+DOCUMENT = {
+    "version": 12345,
+    "skipped": {"nested": [1, 2.5, {"deep": "value"}], "flag": True},
+    "audits": {"first": {"score": 0.25, "items": [-1e-3, None]}, "second": 100},
+    "after": [1, 2],
+}
+
+
+def test_iter_array_decodes_each_element() -> None:
+    """Test that a JSON array is decoded into its elements."""
+    assert list(iter_array(" [ ] ")) == []
+    assert list(iter_array('[{"a": 1}, {"b": [2]}]')) == [{"a": 1}, {"b": [2]}]
+
+
+@pytest.mark.parametrize("text", ['[{"a": 1} {"b": 2}]', '[{"a": 1}', "{}", ""])
+def test_iter_array_malformed(text: str) -> None:
+    """Test that a missing '[' or delimiter raises a JSON decode error."""
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_array(text))
+
+
+@pytest.mark.parametrize("read_size", [1, 3, 7, 1 << 16])
+def test_iter_object_members_from_stream(read_size: int) -> None:
+    """Test that values split across blocks, including numbers, decode whole."""
+    text = json.dumps(DOCUMENT, indent=2)
+
+    members = iter_object_members(io.StringIO(text), "audits", read_size)
+
+    assert dict(members) == DOCUMENT["audits"]
+
+
+def test_iter_object_members_stops_after_key() -> None:
+    """Test that nothing after the requested object is read."""
+    text = json.dumps(DOCUMENT)
+    stream = io.StringIO(text)
+
+    list(iter_object_members(stream, "audits", read_size=8))
+
+    assert stream.tell() < len(text)
+
+
+def test_reader_decodes_numbers_split_across_blocks() -> None:
+    """Test that a number ending a block is not cut short."""
+    reader = JsonStreamReader(io.StringIO("[12345, 6.25e2]"), read_size=3)
+
+    reader.expect("[")
+    assert reader.next_item(first=True)
+    assert reader.decode() == 12345
+    assert reader.next_item(first=False)
+    assert reader.decode() == 625.0
+    assert not reader.next_item(first=False)
+
+
+def test_iter_object_members_missing_key() -> None:
+    """Test that a document without the key yields nothing."""
+    assert list(iter_object_members(io.StringIO(json.dumps(DOCUMENT)), "x")) == []
+
+
+def test_iter_object_members_malformed() -> None:
+    """Test that a truncated stream raises a JSON decode error."""
+    text = json.dumps(DOCUMENT)[:-40]
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_object_members(io.StringIO(text), "after"))
@@ -0,0 +1,236 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from app.utils.lighthouse import LighthouseConfig, LighthouseRunner, ReportChunker
+
+REPORT = {
+    "categories": {
+        "performance": {"auditRefs": [{"id": "speed-index"}]},
+        "seo": {"auditRefs": [{"id": "link-text"}]},
+    },
+    "audits": {
+        "speed-index": {"score": 0.5},
+        "link-text": {"score": 0},
+        "unused-css": {"score": 1},
+    },
+}
+
+
+@pytest.fixture
+def runner(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> LighthouseRunner:
+    """A runner whose audits directory lives under a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CHROME_PATH", "")
+    return LighthouseRunner(LighthouseConfig(cache_ttl=60))
+
+
+def test_iter_audits_empty_audits(tmp_path: Path) -> None:
+    """Test that a report without audits yields nothing."""
+    report_path = tmp_path / "report.json"
+    report_path.write_text(json.dumps({"lighthouseVersion": "12.0.0", "audits": {}}))
+
+    assert list(LighthouseRunner.iter_audits(report_path)) == []
+
+
+def test_iter_audits_nested_audits(tmp_path: Path) -> None:
+    """Test that nested audits are yielded whole and other fields are skipped."""
+    audits = {
+        "largest-contentful-paint": {
+            "score": 0.4,
+            "details": {"items": [{"node": {"snippet": "<img>"}}, {"audits": {}}]},
+        },
+        "link-text": {"score": 0, "details": {"items": []}},
+    }
+    report_path = tmp_path / "report.json"
+    report_path.write_text(
+        json.dumps(
+            {
+                "configSettings": {"audits": {"skipped": True}},
+                "audits": audits,
+                "categories": {"performance": {"auditRefs": []}},
+            },
+            indent=2,
+        )
+    )
+
+    assert dict(LighthouseRunner.iter_audits(report_path)) == audits
+
+
+def test_iter_audits_gzip_report(tmp_path: Path) -> None:
+    """Test that compressed reports are decompressed as they are read."""
+    report_path = tmp_path / "report.json.gz"
+    report_path.write_bytes(gzip.compress(json.dumps(REPORT).encode()))
+
+    assert dict(LighthouseRunner.iter_audits(report_path)) == REPORT["audits"]
+
+
+def test_filter_report_keeps_referenced_audits() -> None:
+    """Test that only the audits of the requested categories are kept."""
+    filtered = ReportChunker.filter_report(REPORT, ["performance", "seo"])
+
+    assert set(filtered["audits"]) == {"speed-index", "link-text"}
+    assert filtered["categories"] is REPORT["categories"]
+
+
+def test_filter_report_unknown_categories() -> None:
+    """Test that a report is returned unchanged when no category matches."""
+    assert ReportChunker.filter_report(REPORT, ["unknown"]) is REPORT
+    assert ReportChunker.filter_report({"audits": {}}, ["performance"]) == {
+        "audits": {}
+    }
+
+
+def test_chunk_report_sizes_chunks_in_tokens() -> None:
+    """Test that max_tokens bounds chunks and cannot be passed positionally."""
+    audit_sizes = {"speed-index": 1500, "link-text": 1500, "unused-css": 1500}
+
+    chunks = list(
+        ReportChunker.chunk_report(REPORT, max_tokens=3000, audit_sizes=audit_sizes)
+    )
+
+    assert [list(chunk["audits"]) for chunk in chunks] == [
+        ["speed-index", "link-text"],
+        ["unused-css"],
+    ]
+    with pytest.raises(TypeError):
+        ReportChunker.chunk_report(REPORT, 8000, 3000)  # type: ignore[misc]
+
+
+def test_chunk_report_positional_size_is_characters() -> None:
+    """Test that the deprecated positional character budget still applies."""
+    audit_sizes = {"speed-index": 1500, "link-text": 1500, "unused-css": 1500}
+
+    with pytest.deprecated_call():
+        chunks = list(ReportChunker.chunk_report(REPORT, 8000, audit_sizes=audit_sizes))
+
+    # 8000 characters are 2000 tokens, room for one audit per chunk
+    assert len(chunks) == 3
+
+
+def test_cached_report_roundtrip(runner: LighthouseRunner) -> None:
+    """Test that a stored report is loaded back for the same URL only."""
+    assert runner._load_cached_report("https://example.com") is None
+
+    runner._store_cached_report("https://example.com", REPORT)
+
+    assert runner._load_cached_report("https://example.com") == REPORT
+    assert runner._load_cached_report("https://example.org") is None
+
+
+def test_cached_report_expires(runner: LighthouseRunner) -> None:
+    """Test that reports older than cache_ttl are not reused."""
+    runner._store_cached_report("https://example.com", REPORT)
+    cache_path = runner._cache_path("https://example.com")
+    stale = time.time() - runner.config.cache_ttl - 1
+    os.utime(cache_path, (stale, stale))
+
+    assert runner._load_cached_report("https://example.com") is None
+
+
+def test_cached_report_ignores_corrupt_entries(runner: LighthouseRunner) -> None:
+    """Test that an unreadable cache entry is treated as a miss."""
+    cache_path = runner._cache_path("https://example.com")
+    cache_path.parent.mkdir(parents=True)
+    cache_path.write_bytes(b"not gzip")
+
+    assert runner._load_cached_report("https://example.com") is None
+
+
+def use_fake_lighthouse(runner: LighthouseRunner, report_dir: Path) -> Path:
+    """Make the runner's Lighthouse CLI print REPORT and count its runs."""
+    runs = report_dir / "runs"
+    script = report_dir / "lighthouse"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import pathlib\n"
+        f"runs = pathlib.Path({str(runs)!r})\n"
+        "runs.write_text(runs.read_text() + 'x' if runs.exists() else 'x')\n"
+        f"print({json.dumps(REPORT)!r})\n"
+    )
+    script.chmod(0o755)
+    runner.config.persistent_worker = False
+    runner._lighthouse_bin = str(script)
+    return runs
+
+
+def test_run_audit_chunks_streams_cached_report(
+    runner: LighthouseRunner, tmp_path: Path
+) -> None:
+    """Test that a cached report is chunked from disk without running an audit."""
+    runs = use_fake_lighthouse(runner, tmp_path)
+    runner.config.only_categories = ["seo"]
+    runner._store_cached_report("https://example.com", REPORT)
+
+    chunks = list(runner.run_audit_chunks("https://example.com", max_tokens=1))
+
+    assert not runs.exists()
+    assert chunks == [{"metadata": {}, "audits": {"link-text": {"score": 0}}}]
+
+
+def test_run_audit_chunks_runs_audit_on_cache_miss(
+    runner: LighthouseRunner, tmp_path: Path
+) -> None:
+    """Test that an audit is run, cached and chunked when nothing is cached."""
+    runs = use_fake_lighthouse(runner, tmp_path)
+
+    chunks = list(runner.run_audit_chunks("https://example.com"))
+    cached_chunks = list(runner.run_audit_chunks("https://example.com"))
+
+    assert runs.read_text() == "x"
+    assert chunks == cached_chunks == [{"metadata": {}, "audits": REPORT["audits"]}]
+
+
+@pytest.mark.parametrize(
+    "worker_source",
+    [
+        # Answers with a line that is not JSON
+        "import sys; sys.stdin.readline(); print('not json', flush=True); sys.stdin.read()",
+        # Never answers
+        "import sys; sys.stdin.readline(); sys.stdin.read()",
+    ],
+)
+def test_broken_worker_falls_back_to_cli(
+    runner: LighthouseRunner,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    worker_source: str,
+) -> None:
+    """Test that a worker that answers badly or not at all is stopped."""
+    runs = use_fake_lighthouse(runner, tmp_path)
+    runner.config.persistent_worker = True
+    runner.config.worker_timeout = 0.5
+    popen = subprocess.Popen
+
+    def fake_popen(args: list[str], **kwargs: object) -> subprocess.Popen:
+        if args[0] == "node":
+            args = [sys.executable, "-c", worker_source]
+        return popen(args, **kwargs)  # type: ignore[call-overload]
+
+    monkeypatch.setattr(subprocess, "Popen", fake_popen)
+
+    report = runner.run_audit("https://example.com", use_cache=False)
+
+    assert report == REPORT
+    assert runs.read_text() == "x"
+    assert runner._worker is None
@@ -14,12 +14,12 @@
 
 # mypy: disable-error-code="attr-defined"
 {%- if "adk" in cookiecutter.tags %}
-import copy
 import datetime
 import json
 import logging
 import os
 from collections.abc import Mapping, Sequence
+from pathlib import Path
 from typing import Any
 
 import google.auth
@@ -68,8 +68,11 @@ class AgentEngineApp(AdkApp):
     def clone(self) -> "AgentEngineApp":
         """Returns a clone of the ADK application."""
         template_attributes = self._tmpl_attrs
+        # The agent is shared rather than deep-copied: ADK agents hold only
+        # configuration (model, instruction, tools), and per-request state lives
+        # in the session service, so clones never mutate it.
         return self.__class__(
-            agent=copy.deepcopy(template_attributes.get("agent")),
+            agent=template_attributes.get("agent"),
             enable_tracing=template_attributes.get("enable_tracing"),
             session_service_builder=template_attributes.get("session_service_builder"),
             artifact_service_builder=template_attributes.get(
@@ -83,6 +86,7 @@ import json
 import logging
 import os
 from collections.abc import Iterable, Mapping, Sequence
+from pathlib import Path
 from typing import (
     Any,
 )
@@ -217,9 +221,12 @@ def deploy_agent_engine_app(
     )
     vertexai.init(project=project, location=location, staging_bucket=staging_bucket)
 
-    # Read requirements
-    with open(requirements_file) as f:
-        requirements = f.read().strip().split("\n")
+    # Read requirements, skipping blank lines and comments
+    requirements = [
+        line.strip()
+        for line in Path(requirements_file).read_text().splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
 {% if "adk" in cookiecutter.tags %}
     agent_engine = AgentEngineApp(agent=root_agent)
 {% else %}
@@ -239,12 +246,15 @@ def deploy_agent_engine_app(
     logging.info(f"Agent config: {agent_config}")
     agent_config["requirements"] = requirements
 
-    # Check if an agent with this name already exists
-    existing_agents = list(agent_engines.list(filter=f"display_name={agent_name}"))
-    if existing_agents:
+    # Check if an agent with this name already exists. The filter is applied
+    # server-side; only the first match is needed, so stop after one result.
+    existing_agent = next(
+        iter(agent_engines.list(filter=f'display_name="{agent_name}"')), None
+    )
+    if existing_agent:
         # Update the existing agent with new configuration
         logging.info(f"Updating existing agent: {agent_name}")
-        remote_agent = existing_agents[0].update(**agent_config)
+        remote_agent = existing_agent.update(**agent_config)
     else:
         # Create a new agent if none exists
         logging.info(f"Creating new agent: {agent_name}")
@@ -256,8 +266,7 @@ def deploy_agent_engine_app(
     }
     config_file = "deployment_metadata.json"
 
-    with open(config_file, "w") as f:
-        json.dump(config, f, indent=2)
+    Path(config_file).write_text(json.dumps(config, indent=2))
 
     logging.info(f"Agent Engine ID written to {config_file}")
 
@@ -15,6 +15,7 @@
 # mypy: disable-error-code="unreachable"
 import importlib
 import json
+import time
 import uuid
 from collections.abc import Generator
 from typing import Any
@@ -175,18 +176,46 @@ class Client:
 class StreamHandler:
     """Handles streaming updates to a Streamlit interface."""
 
-    def __init__(self, st: Any, initial_text: str = "") -> None:
-        """Initialize the StreamHandler with Streamlit context and initial text."""
+    def __init__(
+        self, st: Any, initial_text: str = "", render_interval: float = 0.05
+    ) -> None:
+        """Initialize the StreamHandler with Streamlit context and initial text.
+
+        Tokens arriving within render_interval seconds of the last render are
+        batched into the next one, so fast streams don't re-render per token.
+        """
         self.st = st
         self.tool_expander = st.expander("Tool Calls:", expanded=False)
         self.container = st.empty()
-        self.text = initial_text
+        # Tokens are collected and joined when rendered, avoiding quadratic
+        # string concatenation on long responses
+        self._text_parts = [initial_text]
         self.tools_logs = initial_text
+        self.render_interval = render_interval
+        self._last_render = float("-inf")
+        self._pending = False
+
+    @property
+    def text(self) -> str:
+        """The main text received so far."""
+        if len(self._text_parts) > 1:
+            self._text_parts = ["".join(self._text_parts)]
+        return self._text_parts[0]
 
     def new_token(self, token: str) -> None:
         """Add a new token to the main text display."""
-        self.text += token
+        self._text_parts.append(token)
+        self._pending = True
+        if time.monotonic() - self._last_render >= self.render_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Render any tokens not yet shown in the main text display."""
+        if not self._pending:
+            return
         self.container.markdown(format_content(self.text), unsafe_allow_html=True)
+        self._last_render = time.monotonic()
+        self._pending = False
 
     def new_status(self, status_update: str) -> None:
         """Add a new status update to the tool calls expander."""
@@ -202,11 +231,18 @@ class EventProcessor:
         self.st = st
         self.client = client
         self.stream_handler = stream_handler
-        self.final_content = ""
+        # Streamed chunks are collected and joined on access, avoiding
+        # quadratic string concatenation on long responses
+        self._content_parts: list[str] = []
         self.tool_calls: list[dict[str, Any]] = []
         self.current_run_id: str | None = None
         self.additional_kwargs: dict[str, Any] = {}
 
+    @property
+    def final_content(self) -> str:
+        """The AI response text accumulated so far."""
+        return "".join(self._content_parts)
+
     def process_events(self) -> None:
         """Process events from the stream, handling each event type appropriately."""
         messages = self.st.session_state.user_chats[
@@ -259,18 +295,20 @@ class EventProcessor:
                         message.get("content")
                         and message.get("type") == "AIMessageChunk"
                     ):
-                        self.final_content += message.get("content")
+                        self._content_parts.append(message["content"])
                         self.stream_handler.new_token(message.get("content"))
 
                     # Handle complete AI responses
                     # This is used when receiving a full message rather than chunks
                     elif message.get("content") and message.get("type") == "ai":
-                        self.final_content = message.get("content")
+                        self._content_parts = [message["content"]]
 
-        # Handle end of stream
-        if self.final_content:
+        # Handle end of stream, showing any tokens still batched for rendering
+        self.stream_handler.flush()
+        final_content = self.final_content
+        if final_content:
             final_message = AIMessage(
-                content=self.final_content,
+                content=final_content,
                 id=self.current_run_id,
                 additional_kwargs=self.additional_kwargs,
             ).model_dump()
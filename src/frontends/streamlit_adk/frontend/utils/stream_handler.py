@@ -15,6 +15,7 @@
 # mypy: disable-error-code="unreachable"
 import importlib
 import json
+import time
 from collections.abc import Generator
 from typing import Any
 from urllib.parse import urljoin
@@ -177,18 +178,46 @@ class Client:
 class StreamHandler:
     """Handles streaming updates to a Streamlit interface."""
 
-    def __init__(self, st: Any, initial_text: str = "") -> None:
-        """Initialize the StreamHandler with Streamlit context and initial text."""
+    def __init__(
+        self, st: Any, initial_text: str = "", render_interval: float = 0.05
+    ) -> None:
+        """Initialize the StreamHandler with Streamlit context and initial text.
+
+        Tokens arriving within render_interval seconds of the last render are
+        batched into the next one, so fast streams don't re-render per token.
+        """
         self.st = st
         self.tool_expander = st.expander("Tool Calls:", expanded=False)
         self.container = st.empty()
-        self.text = initial_text
+        # Tokens are collected and joined when rendered, avoiding quadratic
+        # string concatenation on long responses
+        self._text_parts = [initial_text]
         self.tools_logs = initial_text
+        self.render_interval = render_interval
+        self._last_render = float("-inf")
+        self._pending = False
+
+    @property
+    def text(self) -> str:
+        """The main text received so far."""
+        if len(self._text_parts) > 1:
+            self._text_parts = ["".join(self._text_parts)]
+        return self._text_parts[0]
 
     def new_token(self, token: str) -> None:
         """Add a new token to the main text display."""
-        self.text += token
+        self._text_parts.append(token)
+        self._pending = True
+        if time.monotonic() - self._last_render >= self.render_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Render any tokens not yet shown in the main text display."""
+        if not self._pending:
+            return
         self.container.markdown(format_content(self.text), unsafe_allow_html=True)
+        self._last_render = time.monotonic()
+        self._pending = False
 
     def new_status(self, status_update: str) -> None:
         """Add a new status update to the tool calls expander."""
@@ -204,10 +233,17 @@ class EventProcessor:
         self.st = st
         self.client = client
         self.stream_handler = stream_handler
-        self.final_content = ""
+        # Streamed chunks are collected and joined on access, avoiding
+        # quadratic string concatenation on long responses
+        self._content_parts: list[str] = []
         self.tool_calls: list[dict[str, Any]] = []
         self.additional_kwargs: dict[str, Any] = {}
 
+    @property
+    def final_content(self) -> str:
+        """The AI response text accumulated so far."""
+        return "".join(self._content_parts)
+
     def process_events(self) -> None:
         """Process events from the stream, handling each event type appropriately."""
         messages = self.st.session_state.user_chats[
@@ -279,9 +315,12 @@ class EventProcessor:
                         self.st.session_state["invocation_id"] = event.invocation_id
                     else:
                         # For streaming chunks, accumulate text and update UI
-                        self.final_content += part.text
+                        self._content_parts.append(part.text)
                         self.stream_handler.new_token(part.text)
 
+        # Show any tokens still batched for rendering
+        self.stream_handler.flush()
+
 
 def get_chain_response(st: Any, client: Client, stream_handler: StreamHandler) -> None:
     """Process the chain response update the Streamlit UI.
@@ -15,60 +15,89 @@
 import os
 import pathlib
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 from rich.console import Console
 
+from tests.utils.cli import CLI_COMMAND, USE_SUBPROCESS_CLI, invoke_cli
 from tests.utils.get_agents import get_test_combinations_to_run
 
 console = Console()
 TARGET_DIR = "target"
+# Lines of output kept per command; earlier lines are dropped as they arrive
+OUTPUT_TAIL_LINES = 200
 
 
-def run_command(
-    cmd: list[str], cwd: pathlib.Path | None, message: str
+def run_with_output_tail(
+    cmd: list[str], cwd: pathlib.Path | None
 ) -> subprocess.CompletedProcess[bytes]:
-    """Helper function to run commands and handle output"""
-    console.print(f"\n[bold blue]{message}...[/]")
+    """Run a command, keeping only the tail of its combined stdout and stderr.
+
+    Output is read line by line as it is produced, so memory stays bounded
+    even for linters reporting on a large tree.
+
+    Raises:
+        subprocess.CalledProcessError: If the command exits with a non-zero code
+    """
+    tail: deque[bytes] = deque(maxlen=OUTPUT_TAIL_LINES)
+    line_count = 0
+    with subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    ) as process:
+        assert process.stdout is not None
+        for line in process.stdout:
+            tail.append(line)
+            line_count += 1
+
+    output = b"".join(tail)
+    if line_count > len(tail):
+        output = (
+            f"... {line_count - len(tail)} earlier lines omitted\n".encode() + output
+        )
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, output=output)
+    return subprocess.CompletedProcess(cmd, process.returncode, output)
 
-    # For mypy, we want to see the output even if it fails
-    is_mypy = cmd[2] == "mypy"
 
-    if is_mypy:
-        # For mypy, run without capturing output to preserve formatting
-        mypy_result = subprocess.run(
-            cmd,
-            check=False,  # Don't check return code for mypy
-            cwd=cwd,
-        )
+def run_command(
+    cmd: list[str], cwd: pathlib.Path | None, message: str, cli: bool = False
+) -> subprocess.CompletedProcess[bytes]:
+    """Helper function to run commands and handle output
+
+    With cli=True, cmd holds arguments for the starter pack CLI, which is
+    invoked in-process unless USE_SUBPROCESS_CLI is set.
+    """
+    console.print(f"\n[bold blue]{message}...[/]")
 
-        if mypy_result.returncode != 0:
-            console.print(
-                f"[bold red]Mypy failed with exit code: {mypy_result.returncode}[/]"
-            )
-            raise subprocess.CalledProcessError(mypy_result.returncode, cmd, None, None)
-        return mypy_result
-    else:
-        # For other commands, use capture_output
-        try:
-            result = subprocess.run(
-                cmd, check=True, capture_output=True, text=False, cwd=cwd
-            )
-
-            console.print(f"[green]✓[/] {message} completed successfully")
-            if result.stdout:
-                console.print(result.stdout.decode())
-
-            return result
-
-        except subprocess.CalledProcessError as e:
-            console.print(f"[bold red]Error: {message}[/]")
-            if e.stdout:
-                console.print(e.stdout.decode())
-            if e.stderr:
-                console.print(e.stderr.decode())
-            console.print(f"[bold red]Exit code: {e.returncode}[/]")
-            raise
+    # Output is always captured and printed in one piece once the command
+    # finishes, so commands running in parallel don't interleave their output.
+    # Only its last OUTPUT_TAIL_LINES lines are kept.
+    # It is printed without markup so tool output such as mypy's "[arg-type]"
+    # error codes is shown as-is.
+    try:
+        if cli and not USE_SUBPROCESS_CLI:
+            result = invoke_cli(cmd, cwd)
+        else:
+            if cli:
+                cmd = [*CLI_COMMAND, *cmd]
+            result = run_with_output_tail(cmd, cwd)
+
+        console.print(f"[green]✓[/] {message} completed successfully")
+        if result.stdout:
+            console.print(result.stdout.decode(), markup=False)
+
+        return result
+
+    except subprocess.CalledProcessError as e:
+        console.print(f"[bold red]Error: {message}[/]")
+        if e.stdout:
+            console.print(e.stdout.decode(), markup=False)
+        if e.stderr:
+            console.print(e.stderr.decode(), markup=False)
+        console.print(f"[bold red]Exit code: {e.returncode}[/]")
+        raise
 
 
 def test_template_linting(
@@ -86,9 +115,6 @@ def test_template_linting(
 
         # Template the project
         cmd = [
-            "python",
-            "-m",
-            "src.cli.main",
             "create",
             project_name,
             "--agent",
@@ -109,9 +135,11 @@ def test_template_linting(
             cmd,
             pathlib.Path(TARGET_DIR),
             f"Templating {agent} project with {deployment_target}",
+            cli=True,
         )
 
-        # Install dependencies
+        # Install dependencies. uv's default cache is shared by every templated
+        # project, so after the first sync this only links cached packages.
         run_command(
             [
                 "uv",
@@ -120,12 +148,13 @@ def test_template_linting(
                 "--extra",
                 "lint",
                 "--frozen",
+                "--no-progress",
             ],
             project_path,
             "Installing dependencies",
         )
 
-        # Run linting commands one by one
+        # Run linting commands in parallel; they only read the project tree
         lint_commands = [
             ["uv", "run", "codespell"],
             ["uv", "run", "ruff", "check", ".", "--diff"],
@@ -133,18 +162,24 @@ def test_template_linting(
             ["uv", "run", "mypy", "."],
         ]
 
-        for cmd in lint_commands:
-            try:
-                command_name = cmd[2]
-                command_args = cmd[3] if len(cmd) > 3 else ""
-                run_command(cmd, project_path, f"Running {command_name} {command_args}")
-            except subprocess.CalledProcessError as e:
-                console.print(f"[bold red]Linting failed on {cmd[2]}[/]")
-                if e.stdout:
-                    console.print(e.stdout)
-                if e.stderr:
-                    console.print(e.stderr)
-                raise
+        with ThreadPoolExecutor(max_workers=len(lint_commands)) as executor:
+            futures = {
+                executor.submit(
+                    run_command,
+                    cmd,
+                    project_path,
+                    f"Running {cmd[2]} {cmd[3] if len(cmd) > 3 else ''}",
+                ): cmd
+                for cmd in lint_commands
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except subprocess.CalledProcessError:
+                    console.print(
+                        f"[bold red]Linting failed on {futures[future][2]}[/]"
+                    )
+                    raise
 
     except Exception as e:
         console.print(f"[bold red]Error:[/] {e!s}")
@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections.abc import Iterator
 from typing import Any
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from frontend.utils.stream_handler import EventProcessor, StreamHandler
 
 
@@ -38,6 +41,49 @@ class MockStreamlit:
         pass
 
 
+# Stream events shared by the EventProcessor tests, which only read them
+TOOL_CALL_EVENT = {
+    "type": "constructor",
+    "kwargs": {
+        "tool_calls": [
+            {"id": "test_id", "name": "test_tool", "args": {"arg1": "value1"}}
+        ],
+        "type": "AIMessageChunk",
+    },
+}
+
+TOOL_RESPONSE_EVENT = {
+    "type": "constructor",
+    "kwargs": {"tool_call_id": "test_id", "content": "tool response", "type": "tool"},
+}
+
+
+def ai_message_chunk(content: str) -> dict[str, Any]:
+    """Build a stream event for a chunk of the AI response"""
+    return {
+        "type": "constructor",
+        "kwargs": {"content": content, "type": "AIMessageChunk"},
+    }
+
+
+@pytest.fixture
+def st_mock() -> MockStreamlit:
+    """Fixture providing a MockStreamlit instance"""
+    return MockStreamlit()
+
+
+@pytest.fixture
+def client_mock() -> MagicMock:
+    """Fixture providing a mock client to stream events from"""
+    return MagicMock()
+
+
+@pytest.fixture
+def stream_handler_mock() -> MagicMock:
+    """Fixture providing a mock StreamHandler"""
+    return MagicMock()
+
+
 def test_stream_handler_initialization() -> None:
     """Test StreamHandler initialization"""
     st_mock = MagicMock()
@@ -56,11 +102,40 @@ def test_stream_handler_new_token() -> None:
 
     handler.new_token("Hello ")
     handler.new_token("World")
+    handler.flush()
 
     assert handler.text == "Hello World"
     assert handler.container.markdown.call_count == 2
 
 
+def test_stream_handler_batches_renders() -> None:
+    """Test tokens within the render interval are rendered together on flush"""
+    st_mock = MagicMock()
+    handler = StreamHandler(st_mock, render_interval=60)
+
+    for token in ["a", "b", "c", "d"]:
+        handler.new_token(token)
+    assert handler.container.markdown.call_count == 1
+
+    handler.flush()
+    handler.flush()
+    assert handler.container.markdown.call_count == 2
+    assert handler.container.markdown.call_args[0][0] == "abcd"
+
+
+def test_stream_handler_text_includes_initial_text() -> None:
+    """Test streamed tokens are appended to the initial text"""
+    st_mock = MagicMock()
+    handler = StreamHandler(st_mock, initial_text="> ", render_interval=60)
+
+    for token in ["a", "b", "c"]:
+        handler.new_token(token)
+
+    assert handler.text == "> abc"
+    handler.new_token("d")
+    assert handler.text == "> abcd"
+
+
 def test_stream_handler_new_status() -> None:
     """Test adding status updates to StreamHandler"""
     st_mock = MagicMock()
@@ -73,43 +148,19 @@ def test_stream_handler_new_status() -> None:
     assert handler.tool_expander.markdown.call_count == 2
 
 
-def test_event_processor_tool_calls() -> None:
+def test_event_processor_tool_calls(
+    st_mock: MockStreamlit, client_mock: MagicMock, stream_handler_mock: MagicMock
+) -> None:
     """Test EventProcessor handling of tool calls"""
-    st_mock = MockStreamlit()
-    client_mock = MagicMock()
-    stream_handler_mock = MagicMock()
-
     # Mock stream events with tool calls
-    tool_call_event = {
-        "type": "constructor",
-        "kwargs": {
-            "tool_calls": [
-                {"id": "test_id", "name": "test_tool", "args": {"arg1": "value1"}}
-            ]
-        },
-    }
-
-    tool_response_event = {
-        "type": "constructor",
-        "kwargs": {"tool_call_id": "test_id", "content": "tool response"},
-    }
-
-    ai_message_chunk = {
-        "type": "constructor",
-        "kwargs": {"content": "partial ", "type": "AIMessageChunk"},
-    }
-
-    final_response_event = {
-        "type": "constructor",
-        "kwargs": {"content": "response", "type": "AIMessageChunk"},
-    }
-
-    client_mock.stream_messages.return_value = [
-        (tool_call_event, {}),
-        (tool_response_event, {}),
-        (ai_message_chunk, {}),
-        (final_response_event, {}),
-    ]
+    client_mock.stream_messages.return_value = iter(
+        [
+            (TOOL_CALL_EVENT, {}),
+            (TOOL_RESPONSE_EVENT, {}),
+            (ai_message_chunk("partial "), {}),
+            (ai_message_chunk("response"), {}),
+        ]
+    )
 
     processor = EventProcessor(st_mock, client_mock, stream_handler_mock)
     processor.process_events()
@@ -131,31 +182,17 @@ def test_event_processor_tool_calls() -> None:
     stream_handler_mock.new_token.assert_any_call("response")
 
 
-def test_event_processor_direct_response() -> None:
+def test_event_processor_direct_response(
+    st_mock: MockStreamlit, client_mock: MagicMock, stream_handler_mock: MagicMock
+) -> None:
     """Test EventProcessor handling direct AI responses"""
-    st_mock = MockStreamlit()
-    client_mock = MagicMock()
-    stream_handler_mock = MagicMock()
-
     # Mock stream events with direct response
-    response_events: list[tuple[dict[str, Any], dict[str, Any]]] = [
-        (
-            {
-                "type": "constructor",
-                "kwargs": {"content": "Hello", "type": "AIMessageChunk"},
-            },
-            {},
-        ),
-        (
-            {
-                "type": "constructor",
-                "kwargs": {"content": " World", "type": "AIMessageChunk"},
-            },
-            {},
-        ),
-    ]
-
-    client_mock.stream_messages.return_value = response_events
+    client_mock.stream_messages.return_value = iter(
+        [
+            (ai_message_chunk("Hello"), {}),
+            (ai_message_chunk(" World"), {}),
+        ]
+    )
 
     processor = EventProcessor(st_mock, client_mock, stream_handler_mock)
     processor.process_events()
@@ -170,23 +207,54 @@ def test_event_processor_direct_response() -> None:
     stream_handler_mock.new_token.assert_any_call(" World")
 
 
+def test_event_processor_streams_without_buffering(
+    st_mock: MockStreamlit, client_mock: MagicMock, stream_handler_mock: MagicMock
+) -> None:
+    """Test EventProcessor handles each event before reading the next one"""
+    chunks = ["a", "b", "c"]
+    events_read = 0
+
+    def stream() -> Iterator[tuple[dict[str, Any], dict[str, Any]]]:
+        nonlocal events_read
+        for chunk in chunks:
+            events_read += 1
+            yield ai_message_chunk(chunk), {}
+
+    # Number of events read from the stream when each token was handled
+    events_read_per_token: list[int] = []
+    stream_handler_mock.new_token.side_effect = lambda _: events_read_per_token.append(
+        events_read
+    )
+    client_mock.stream_messages.return_value = stream()
+
+    processor = EventProcessor(st_mock, client_mock, stream_handler_mock)
+    processor.process_events()
+
+    assert events_read_per_token == [1, 2, 3]
+    assert processor.final_content == "abc"
+
+
 @patch("uuid.uuid4", return_value="test_run")
-def test_event_processor_session_state_updates(mock_uuid: MagicMock) -> None:
+def test_event_processor_session_state_updates(
+    mock_uuid: MagicMock,
+    st_mock: MockStreamlit,
+    client_mock: MagicMock,
+    stream_handler_mock: MagicMock,
+) -> None:
     """Test EventProcessor updates to session state"""
-    st_mock = MockStreamlit()
-    client_mock = MagicMock()
-    stream_handler_mock = MagicMock()
 
     # Mock stream events with message that should be added to session state
-    client_mock.stream_messages.return_value = [
-        (
-            {
-                "type": "constructor",
-                "kwargs": {"content": "test response", "type": "ai"},
-            },
-            {},
-        )
-    ]
+    client_mock.stream_messages.return_value = iter(
+        [
+            (
+                {
+                    "type": "constructor",
+                    "kwargs": {"content": "test response", "type": "ai"},
+                },
+                {},
+            )
+        ]
+    )
 
     # Initialize session state with empty messages
     st_mock.session_state.user_chats["test_session"]["messages"] = []
@@ -223,62 +291,22 @@ def test_event_processor_session_state_updates(mock_uuid: MagicMock) -> None:
 
 
 @patch("uuid.uuid4", return_value="test_run")
-def test_event_processor_session_state_updates_with_tools(mock_uuid: MagicMock) -> None:
+def test_event_processor_session_state_updates_with_tools(
+    mock_uuid: MagicMock,
+    st_mock: MockStreamlit,
+    client_mock: MagicMock,
+    stream_handler_mock: MagicMock,
+) -> None:
     """Test EventProcessor updates to session state when using tools"""
-    st_mock = MockStreamlit()
-    client_mock = MagicMock()
-    stream_handler_mock = MagicMock()
-
     # Mock stream events with tool calls and final response
-    client_mock.stream_messages.return_value = [
-        (
-            {
-                "type": "constructor",
-                "kwargs": {
-                    "tool_calls": [
-                        {
-                            "id": "test_id",
-                            "name": "test_tool",
-                            "args": {"arg1": "value1"},
-                        }
-                    ],
-                    "type": "AIMessageChunk",
-                },
-            },
-            {},
-        ),
-        (
-            {
-                "type": "constructor",
-                "kwargs": {
-                    "tool_call_id": "test_id",
-                    "content": "tool response",
-                    "type": "tool",
-                },
-            },
-            {},
-        ),
-        (
-            {
-                "type": "constructor",
-                "kwargs": {
-                    "content": "partial response",
-                    "type": "AIMessageChunk",
-                },
-            },
-            {},
-        ),
-        (
-            {
-                "type": "constructor",
-                "kwargs": {
-                    "content": " final",
-                    "type": "AIMessageChunk",
-                },
-            },
-            {},
-        ),
-    ]
+    client_mock.stream_messages.return_value = iter(
+        [
+            (TOOL_CALL_EVENT, {}),
+            (TOOL_RESPONSE_EVENT, {}),
+            (ai_message_chunk("partial response"), {}),
+            (ai_message_chunk(" final"), {}),
+        ]
+    )
 
     # Initialize session state with empty messages
     st_mock.session_state.user_chats["test_session"]["messages"] = []
@@ -0,0 +1,53 @@
+import contextlib
+import os
+import pathlib
+import subprocess
+from collections.abc import Iterator
+
+from click.testing import CliRunner
+
+from src.cli.main import cli
+
+# Command used to run the CLI in its own process
+CLI_COMMAND = ["python", "-m", "src.cli.main"]
+
+# Set USE_SUBPROCESS_CLI=1 to run the CLI as a subprocess for full isolation
+# instead of in-process
+USE_SUBPROCESS_CLI = bool(os.environ.get("USE_SUBPROCESS_CLI"))
+
+
+@contextlib.contextmanager
+def working_directory(path: pathlib.Path | None) -> Iterator[None]:
+    """Temporarily change the working directory, if a path is given."""
+    if path is None:
+        yield
+        return
+    original_dir = pathlib.Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(original_dir)
+
+
+def invoke_cli(
+    args: list[str], cwd: pathlib.Path | None = None, check: bool = True
+) -> subprocess.CompletedProcess[bytes]:
+    """Invoke the CLI in-process, avoiding interpreter startup and imports.
+
+    The working directory is changed for the duration of the call, so this is
+    not safe to use from several threads at once.
+
+    Raises:
+        subprocess.CalledProcessError: If check is set and the CLI exits with a
+            non-zero code
+    """
+    with working_directory(cwd):
+        result = CliRunner().invoke(cli, args, catch_exceptions=False)
+
+    cmd = [*CLI_COMMAND, *args]
+    if check and result.exit_code != 0:
+        raise subprocess.CalledProcessError(
+            result.exit_code, cmd, output=result.stdout_bytes
+        )
+    return subprocess.CompletedProcess(cmd, result.exit_code, result.stdout_bytes)